@@ -4,6 +4,8 @@ from .nodes.show_translate_string import ShowTranslateString
 from .nodes.string_matcher import StringMatcher
 from .nodes.time_formatter import TimeFormatter
 from .nodes.string_converter import StringConverter
+from .nodes.string_helper_stats import StringHelperStats
+from .nodes.bulk_translate_csv import BulkTranslateCSV
 
 NODE_CLASS_MAPPINGS = {
     "StringFormatter": StringFormatter,
@@ -15,7 +17,9 @@ NODE_CLASS_MAPPINGS = {
     "ShowTranslateString": ShowTranslateString,
     "StringMatcher": StringMatcher,
     "TimeFormatter": TimeFormatter,
-    "StringConverter": StringConverter
+    "StringConverter": StringConverter,
+    "StringHelperStats": StringHelperStats,
+    "BulkTranslateCSV": BulkTranslateCSV
 }
 
 NODE_DISPLAY_NAME_MAPPINGS = {
@@ -28,7 +32,9 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "ShowTranslateString": "🐟Show Translate String",
     "StringMatcher": "🐟String Matcher",
     "TimeFormatter": "🐟Time Formatter",
-    "StringConverter": "🐟String Converter"
+    "StringConverter": "🐟String Converter",
+    "StringHelperStats": "🐟String Helper Stats",
+    "BulkTranslateCSV": "🐟Bulk Translate CSV"
 }
 
 WEB_DIRECTORY = "./web"
@@ -0,0 +1,89 @@
+"""Compare full-file chardet detection against the tiered encoding detector.
+
+Generates prompt-library CSVs of the requested sizes in UTF-8, UTF-8 with BOM
+and GBK, then times:
+
+- legacy: ``chardet.detect`` over the whole file (the previous behaviour)
+- tiered: BOM sniffing, strict UTF-8 decode, sampled chardet fallback
+- cached: a repeated lookup for an unchanged file
+
+    python benchmarks/bench_encoding.py --sizes 1,10,100 --legacy-max-mb 10
+"""
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+ENCODINGS = ('utf-8', 'utf-8-sig', 'gbk')
+ROW = {
+    'string': 'A woman sitting on outdoor stairs, adjusting her white headphones, natural daylight',
+    'zh': '一位女性坐在户外的楼梯上，调整她的白色耳机，自然日光',
+    'tags': '休闲 (casual), 女孩 (girl), 户外 (outdoor), 现代 (modern)',
+}
+
+
+def generate_csv(path, encoding, size_mb):
+    """Write rows until the file reaches roughly size_mb megabytes."""
+    target = size_mb * 1024 * 1024
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=['string', 'zh', 'tags'])
+        writer.writeheader()
+        i = 0
+        while True:
+            for _ in range(1000):
+                writer.writerow({**ROW, 'string': f"{ROW['string']} #{i}"})
+                i += 1
+            if f.tell() >= target:
+                break
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def legacy_detect(path):
+    import chardet
+    with open(path, 'rb') as f:
+        return chardet.detect(f.read())['encoding']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1,10,100', help='comma-separated file sizes in MB')
+    parser.add_argument('--legacy-max-mb', type=float, default=10,
+                        help='skip the full-file chardet run above this size (it takes minutes)')
+    args = parser.parse_args()
+
+    from common import load_package
+    load_package()
+    from string_helper.csv_utils import EncodingCache
+
+    sizes = [float(size) for size in args.sizes.split(',') if size.strip()]
+    print(f"{'file':<22}{'legacy':>12}{'tiered':>12}{'cached':>12}  detected")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_mb in sizes:
+            for encoding in ENCODINGS:
+                path = os.path.join(tmp, f"{encoding}_{size_mb:g}mb.csv")
+                generate_csv(path, encoding, size_mb)
+
+                if size_mb <= args.legacy_max_mb:
+                    _, legacy = timed(legacy_detect, path)
+                    legacy_text = f"{legacy * 1000:10.1f}ms"
+                else:
+                    legacy_text = f"{'skipped':>12}"
+
+                cache = EncodingCache()
+                detected, tiered = timed(cache.detect, path)
+                _, cached = timed(cache.detect, path)
+                print(f"{os.path.basename(path):<22}{legacy_text}{tiered * 1000:10.1f}ms"
+                      f"{cached * 1000:10.3f}ms  {detected}")
+                os.remove(path)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Compare per-call eval of the f-string template with the cached compiled template.
+
+The sandboxed "safe" engine is measured too for templates it supports.
+
+    python benchmarks/bench_formatter.py --iterations 20000
+"""
+import argparse
+import sys
+import time
+
+TEMPLATES = {
+    'simple': 'Hello {arg1}, today is {arg2}',
+    'prompt': ('masterpiece, best quality, {arg1}, {arg2} lighting, shot on {arg3}, '
+               '{arg4} style, seed {arg5:08d}, cfg {arg6:.1f}'),
+    'expressions': '{arg1.upper()} | {", ".join(arg2)} | {arg3["name"]} | {arg5 * 2}',
+}
+ARGS = {
+    'arg1': 'a woman sitting on outdoor stairs',
+    'arg2': ['soft', 'natural'],
+    'arg3': {'name': 'portrait', 'type': 'lora'},
+    'arg4': 'cinematic',
+    'arg5': 42,
+    'arg6': 7.5,
+}
+
+
+def legacy_format(template, **args):
+    return eval(f"f'''{template}'''", dict(args))
+
+
+def measure(func, template, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(template, **ARGS)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    from common import load_package
+    load_package()
+    from string_helper.nodes.string_formatter import StringFormatter
+
+    def cached_format(template, **args):
+        return StringFormatter.format_string(template, **args)['result'][0]
+
+    def safe_format(template, **args):
+        return StringFormatter.format_string(template, template_engine='safe', **args)['result'][0]
+
+    print(f"{'template':<14}{'eval/call':>14}{'cached/call':>14}{'speedup':>10}{'safe/call':>14}")
+    for name, template in TEMPLATES.items():
+        expected = legacy_format(template, **ARGS)
+        assert cached_format(template, **ARGS) == expected
+        legacy = measure(legacy_format, template, args.iterations)
+        cached = measure(cached_format, template, args.iterations)
+        if safe_format(template, **ARGS) == expected:
+            safe = f"{measure(safe_format, template, args.iterations):>12.2f}us"
+        else:
+            safe = f"{'n/a':>14}"
+        print(f"{name:<14}{legacy:>12.2f}us{cached:>12.2f}us{legacy / cached:>9.1f}x{safe}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Measure how long the node pack takes to register its nodes.
+
+Each sample imports the pack in a fresh interpreter, the way ComfyUI does on
+boot, and records the time until NODE_CLASS_MAPPINGS is available. It also
+checks that heavy dependencies are not imported at startup.
+
+    python benchmarks/bench_startup.py --runs 20 --budget-ms 20
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+# Modules that must only be loaded on first use
+LAZY_MODULES = ('translators', 'chardet')
+
+
+def child():
+    from common import load_package
+
+    start = time.perf_counter()
+    package = load_package()
+    elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'ms': elapsed * 1000,
+        'nodes': len(package.NODE_CLASS_MAPPINGS),
+        'loaded': [name for name in LAZY_MODULES if name in sys.modules],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=20.0,
+                        help='fail if the median import time exceeds this budget')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return 0
+
+    samples = []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, __file__, '--child'],
+                                check=True, capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    times = [sample['ms'] for sample in samples]
+    median = statistics.median(times)
+    loaded = sorted({name for sample in samples for name in sample['loaded']})
+    print(f"nodes registered: {samples[0]['nodes']}")
+    print(f"import time: median {median:.2f} ms, min {min(times):.2f} ms, max {max(times):.2f} ms "
+          f"over {len(times)} runs")
+    print(f"heavy modules loaded at startup: {', '.join(loaded) or 'none'}")
+
+    if loaded or median > args.budget_ms:
+        print('FAIL')
+        return 1
+    print('OK')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""Shared helpers for the benchmark scripts.
+
+The node pack uses relative imports, so it has to be loaded as a package the
+same way ComfyUI does it; ``load_package`` takes care of that.
+"""
+import csv
+import importlib.util
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGE_NAME = 'string_helper'
+
+
+def load_package(name=PACKAGE_NAME):
+    """Import the node pack as a package named ``name`` and return it."""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(
+        name, os.path.join(REPO_ROOT, '__init__.py'), submodule_search_locations=[REPO_ROOT]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def measure(func, setup=None, repeat=5):
+    """Time ``func`` and record its peak traced memory.
+
+    ``setup`` runs untimed before every call (e.g. to clear caches for a cold run).
+    Timing uses the median of ``repeat`` calls; peak memory comes from one extra
+    call under tracemalloc so tracing does not distort the timings.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'seconds': statistics.median(times), 'peak_bytes': peak}
+
+
+def write_prompt_csv(path, rows, encoding='utf-8'):
+    """Write a prompt library CSV in the template format with ``rows`` rows."""
+    tags = ['休闲 (casual)', '女孩 (girl)', '户外 (outdoor)', '现代 (modern)', '街景 (street photography)',
+            '短发 (short hair)', '时尚 (stylish)', '简约 (minimalist)', '夜景 (night)', '人像 (portrait)']
+    with open(path, 'w', encoding=encoding, newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['string', 'zh', 'tags'])
+        for i in range(rows):
+            writer.writerow([
+                f"A woman sitting on outdoor stairs, adjusting her white headphones, natural daylight #{i}",
+                f"一位女性坐在户外的楼梯上，调整她的白色耳机，自然日光 #{i}",
+                ', '.join(tags[(i + j) % len(tags)] for j in range(i % 4 + 2)),
+            ])
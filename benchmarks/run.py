@@ -0,0 +1,203 @@
+"""Run the offline benchmark suite over every node's hot path.
+
+Records the median time and peak traced memory of each case and compares them
+against a stored baseline, failing when a case regresses beyond the tolerance.
+
+    python benchmarks/run.py                      # compare against baseline.json
+    python benchmarks/run.py --rows 1000,1000000  # include a 1M-row library
+    python benchmarks/run.py --save-baseline      # record a new baseline
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from common import load_package, measure, write_prompt_csv
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+# Differences below these are treated as noise regardless of the ratio
+MIN_TIME_DELTA = 0.002
+MIN_MEMORY_DELTA = 1024 * 1024
+# Simulated per-request latency of the mocked translation backend (seconds)
+MOCK_LATENCY = 0.002
+
+PROMPT = ('The image shows a woman sitting on a set of outdoor stairs. She is leaning back, '
+          'her body angled slightly, with her left arm resting behind her. ')
+
+
+def translation_cases():
+    from string_helper import translation_utils
+    from string_helper.translation_backends import LocalTranslator, register_translator
+    from string_helper.translation_cache import TranslationCache
+
+    # Offline backend with a fixed latency, no rate limit and an in-memory cache
+    backend = LocalTranslator(latency=MOCK_LATENCY)
+    backend.name = 'benchmark'
+    # Behave like a network backend, whose results go through the translation cache
+    backend.cache_results = True
+    register_translator(backend)
+    translation_utils._rate_limiters[backend.name] = translation_utils.RateLimiter(0)
+    translation_utils.translation_cache = TranslationCache(':memory:')
+
+    long_text = '\n'.join(PROMPT * 20 for _ in range(20))
+    short_texts = [f"tag {i}" for i in range(500)]
+
+    return [
+        ('split_text_for_translation[200KB]',
+         lambda: translation_utils.split_text_for_translation(long_text * 3), None),
+        ('translate_text[long, mock backend]',
+         lambda: translation_utils.translate_text(long_text, 'en', 'zh', 'benchmark'),
+         translation_utils.translation_cache.clear),
+        ('translate_texts[500 short, mock backend]',
+         lambda: translation_utils.translate_texts(short_texts, 'zh', 'benchmark'),
+         translation_utils.translation_cache.clear),
+        ('translate_texts[500 short, cached]',
+         lambda: translation_utils.translate_texts(short_texts, 'zh', 'benchmark'), None),
+    ]
+
+
+def csv_cases(tmp, row_counts):
+    from string_helper.csv_utils import csv_cache, encoding_cache
+    from string_helper.csv_writer import flush_writes
+    from string_helper.nodes.string_list import StringListFromCSV, StringListToCSV
+
+    def clear_caches():
+        csv_cache.clear()
+        encoding_cache.clear()
+
+    reader = StringListFromCSV()
+    writer = StringListToCSV()
+    cases = []
+    for rows in row_counts:
+        path = os.path.join(tmp, f"library_{rows}.csv")
+        write_prompt_csv(path, rows)
+        output_path = os.path.join(tmp, f"output_{rows}.csv")
+        shutil.copyfile(path, output_path)
+        counter = iter(range(10 ** 9))
+
+        def append_rows(output_path=output_path, counter=counter):
+            batch = [{'string': f"new prompt {next(counter)}", 'zh': '', 'tags': 'new'} for _ in range(10)]
+            writer.save_to_csv(output_path, batch)
+
+        def append_rows_flushed(output_path=output_path):
+            append_rows(output_path)
+            flush_writes(output_path)
+
+        cases += [
+            (f"read_csv_with_encoding[{rows} rows, cold]",
+             lambda path=path: reader.read_csv_with_encoding(path), clear_caches),
+            (f"read_csv_with_encoding[{rows} rows, warm]",
+             lambda path=path: reader.read_csv_with_encoding(path), None),
+            (f"read_csv_file[{rows} rows, cold]",
+             lambda path=path: reader.read_csv_file(path), clear_caches),
+            (f"read_csv_file[{rows} rows, filter_tags, warm]",
+             lambda path=path: reader.read_csv_file(path, 'girl, outdoor', False, 'all'), None),
+            (f"save_to_csv[append 10 into {rows} rows]", append_rows, None),
+            (f"save_to_csv[append 10 into {rows} rows, flushed]", append_rows_flushed, None),
+        ]
+    return cases
+
+
+def node_cases():
+    from string_helper.nodes.string_formatter import StringFormatter
+    from string_helper.nodes.string_matcher import StringMatcher, compile_conditions
+
+    conditions = '\n'.join(
+        [f"keyword{i}:value{i}" for i in range(500)] +
+        [f".*pattern{i}.*:regex{i}" for i in range(500)]
+    )
+    inputs = [f"some text with pattern{i} inside" for i in range(0, 500, 5)] + ['no match']
+    matcher = StringMatcher()
+
+    def match_all():
+        for value in inputs:
+            matcher.match_string(conditions, 'STRING', value)
+
+    template = ('masterpiece, best quality, {arg1}, {arg2} lighting, shot on {arg3}, '
+                '{arg4} style, seed {arg5:08d}')
+    args = {'arg1': 'a woman on stairs', 'arg2': 'natural', 'arg3': '35mm', 'arg4': 'cinematic', 'arg5': 42}
+
+    return [
+        ('StringMatcher.match_string[1000 rules x 101 values]', match_all, None),
+        ('StringMatcher.match_string[1000 rules, cold compile]',
+         lambda: matcher.match_string(conditions, 'STRING', inputs[0]), compile_conditions.cache_clear),
+        ('StringFormatter.format_string[x1000]',
+         lambda: [StringFormatter.format_string(template, **args) for _ in range(1000)], None),
+        ('StringFormatter.format_string[safe x1000]',
+         lambda: [StringFormatter.format_string(template, template_engine='safe', **args) for _ in range(1000)], None),
+        ('StringFormatter.format_string[product 10x10x10]',
+         lambda: StringFormatter.format_string(template, arg1=list(range(10)), arg2=list(range(10)),
+                                               arg3=list(range(10)), arg4='x', arg5=1, expand_mode='product'),
+         None),
+    ]
+
+
+def compare(name, result, baseline, tolerance):
+    """Return a list of regression messages for one case."""
+    previous = baseline.get(name)
+    if not previous:
+        return []
+    problems = []
+    if (result['seconds'] > previous['seconds'] * tolerance and
+            result['seconds'] - previous['seconds'] > MIN_TIME_DELTA):
+        problems.append(f"time {previous['seconds'] * 1000:.2f}ms -> {result['seconds'] * 1000:.2f}ms")
+    if (result['peak_bytes'] > previous['peak_bytes'] * tolerance and
+            result['peak_bytes'] - previous['peak_bytes'] > MIN_MEMORY_DELTA):
+        problems.append(f"peak {previous['peak_bytes'] / 1024:.0f}KB -> {result['peak_bytes'] / 1024:.0f}KB")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', default='1000,10000,100000', help='comma-separated CSV row counts')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='fail when time or peak memory exceeds baseline by this factor')
+    parser.add_argument('--save-baseline', action='store_true')
+    args = parser.parse_args()
+
+    load_package()
+    row_counts = [int(rows) for rows in args.rows.split(',') if rows.strip()]
+
+    baseline = {}
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = translation_cases() + csv_cases(tmp, row_counts) + node_cases()
+        print(f"{'case':<56}{'time':>12}{'peak':>12}{'baseline':>12}")
+        for name, func, setup in cases:
+            if args.filter not in name:
+                continue
+            result = measure(func, setup, args.repeat)
+            results[name] = result
+            previous = baseline.get(name)
+            previous_text = f"{previous['seconds'] * 1000:10.2f}ms" if previous else f"{'-':>12}"
+            problems = compare(name, result, baseline, args.tolerance)
+            print(f"{name:<56}{result['seconds'] * 1000:10.2f}ms{result['peak_bytes'] / 1024:10.0f}KB"
+                  f"{previous_text}{'  REGRESSION: ' + '; '.join(problems) if problems else ''}")
+            if problems:
+                regressions.append(name)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Saved baseline for {len(results)} cases to {args.baseline}")
+        return 0
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance}x baseline")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,404 @@
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from . import translation_utils
+from .csv_index import csv_state, get_dedup_index
+from .csv_utils import encoding_cache, iter_csv_rows
+from .csv_writer import file_lock, flush_writes
+from .stats import stats
+
+# 每批翻译并提交（写入临时文件并记录进度）的行数
+BULK_CHUNK_ROWS = int(os.environ.get('STRING_HELPER_BULK_CHUNK_ROWS', 200))
+# 同时在翻译中的批次数：当前批次写入时下一批已在翻译，避免批次之间翻译线程空闲
+BULK_PIPELINE_DEPTH = 2
+# 翻译结果先写入该后缀的临时文件，全部完成后再替换原文件
+PARTIAL_SUFFIX = '.partial'
+# 进度文件的后缀，记录已提交的行数和临时文件长度，中断后据此续跑
+PROGRESS_SUFFIX = '.progress'
+# 计算源文件摘要时每次读取的字节数
+DIGEST_CHUNK_BYTES = 1024 * 1024
+
+
+def _prefix_digest(path, size):
+    """计算文件前size字节的摘要，用于判断续跑时源文件是否被修改（仅追加时仍可续跑）"""
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(DIGEST_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest() if remaining == 0 else None
+
+
+def _format_duration(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+def _needs_translation(row, source_index, target_index):
+    """原文非空且译文为空的行需要翻译"""
+    source = row[source_index] if source_index < len(row) else ''
+    target = row[target_index] if target_index is not None and target_index < len(row) else ''
+    return bool(source) and not target
+
+
+def _format_row(row, raw):
+    """将行重新生成为CSV文本，沿用原文的换行符"""
+    terminator = raw[len(raw.rstrip('\r\n')):]
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator=terminator).writerow(row)
+    return buffer.getvalue()
+
+
+class _RawLines:
+    """逐行读取文件并记录已读的原文，csv.reader每返回一条记录后取出该记录对应的原文"""
+
+    def __init__(self, f):
+        self.f = f
+        self.lines = []
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.f)
+        self.lines.append(line)
+        return line
+
+    def take(self):
+        raw = ''.join(self.lines)
+        self.lines = []
+        return raw
+
+
+def _raw_records(reader, lines):
+    """生成 (行, 原文)，空行的行为空列表"""
+    while True:
+        row = next(reader, None)
+        if row is None:
+            return
+        yield row, lines.take()
+
+
+class BulkTranslateJob:
+    """
+    批量翻译整个CSV文件：流式读取，只翻译目标列为空的行，多批次并发翻译。
+    结果按批次写入临时文件并记录进度，全部完成后原子替换输出文件；中断后再次运行会从最后提交的行继续。
+    """
+
+    def __init__(self, csv_path, source_column='string', target_column='zh', target_language='zh',
+                 translator=None, output_path=None, chunk_size=BULK_CHUNK_ROWS,
+                 max_workers=translation_utils.MAX_WORKERS, progress=print):
+        if source_column == target_column:
+            raise ValueError("source_column and target_column must differ")
+        self.csv_path = os.path.abspath(csv_path)
+        self.output_path = os.path.abspath(output_path or csv_path)
+        self.partial_path = self.output_path + PARTIAL_SUFFIX
+        self.progress_path = self.output_path + PROGRESS_SUFFIX
+        self.source_column = source_column
+        self.target_column = target_column
+        self.target_language = target_language
+        self.translator = translator or translation_utils.DEFAULT_TRANSLATOR
+        self.chunk_size = max(1, chunk_size)
+        self.max_workers = max_workers
+        self.progress = progress or (lambda message: None)
+
+        self.total_rows = 0
+        self.rows_done = 0
+        self.resumed_rows = 0
+        self.translated = 0
+        self.failed = 0
+        self.started = None
+
+    def _load_progress(self):
+        """读取进度文件，与当前任务和源文件不一致时返回None"""
+        try:
+            with open(self.progress_path, 'r', encoding='utf-8') as f:
+                progress = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        expected = {
+            'source': self.csv_path,
+            'source_column': self.source_column,
+            'target_column': self.target_column,
+            'target_language': self.target_language,
+        }
+        if any(progress.get(key) != value for key, value in expected.items()):
+            return None
+        try:
+            if os.path.getsize(self.partial_path) < progress['output_bytes']:
+                return None
+            if _prefix_digest(self.csv_path, progress['source_size']) != progress['source_digest']:
+                return None
+        except (OSError, KeyError):
+            return None
+        return progress
+
+    def _save_progress(self, source_size, source_digest, output_bytes):
+        progress = {
+            'source': self.csv_path,
+            'source_column': self.source_column,
+            'target_column': self.target_column,
+            'target_language': self.target_language,
+            'source_size': source_size,
+            'source_digest': source_digest,
+            'rows_done': self.rows_done,
+            'output_bytes': output_bytes,
+        }
+        tmp_path = self.progress_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(progress, f)
+        os.replace(tmp_path, self.progress_path)
+
+    def _scan(self, encoding):
+        """返回数据行数和需要翻译（原文非空、译文为空）的行数"""
+        total = pending = 0
+        with open(self.csv_path, 'r', encoding=encoding, newline='') as f:
+            reader = csv.reader(f)
+            source_index, target_index = self._column_indexes(next(reader, None))
+            for row in reader:
+                if row:
+                    total += 1
+                    pending += _needs_translation(row, source_index, target_index)
+        return total, pending
+
+    def _column_indexes(self, header):
+        """返回原文列和译文列的位置，译文列不存在时为None"""
+        if header is None or self.source_column not in header:
+            raise ValueError(f"Column '{self.source_column}' not found in {self.csv_path}")
+        target_index = header.index(self.target_column) if self.target_column in header else None
+        return header.index(self.source_column), target_index
+
+    def _translate_chunk(self, texts):
+        with stats.timer('bulk.chunk'):
+            return translation_utils.translate_texts_detailed(
+                texts, self.target_language, self.translator, self.max_workers
+            )
+
+    def _report(self):
+        elapsed = time.monotonic() - self.started
+        processed = self.rows_done - self.resumed_rows
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        remaining = self.total_rows - self.rows_done
+        eta = _format_duration(remaining / rate) if rate > 0 else '-'
+        percent = self.rows_done * 100 / self.total_rows if self.total_rows else 100.0
+        self.progress(
+            f"Bulk translate: {self.rows_done}/{self.total_rows} rows ({percent:.1f}%), "
+            f"{self.translated} translated, {self.failed} failed, {rate:.1f} rows/s, ETA {eta}"
+        )
+
+    def summary(self):
+        """返回本次运行的结果摘要"""
+        elapsed = time.monotonic() - self.started if self.started else 0.0
+        processed = self.rows_done - self.resumed_rows
+        return {
+            'csv': self.csv_path,
+            'output': self.output_path,
+            'rows': self.total_rows,
+            'rows_done': self.rows_done,
+            'resumed_from': self.resumed_rows,
+            'translated': self.translated,
+            'failed': self.failed,
+            'elapsed_s': round(elapsed, 3),
+            'rows_per_s': round(processed / elapsed, 2) if elapsed > 0 else 0.0,
+            'completed': self.rows_done >= self.total_rows and not os.path.exists(self.progress_path),
+        }
+
+    def run(self):
+        """运行任务并返回结果摘要；翻译服务熔断时提前停止，再次运行即可继续"""
+        self.started = time.monotonic()
+        flush_writes(self.csv_path)
+        encoding = encoding_cache.detect(self.csv_path)
+
+        progress = self._load_progress()
+        self.total_rows, pending_rows = self._scan(encoding)
+        if progress is None and pending_rows == 0:
+            # 没有需要翻译的行时不改动文件，避免改变文件签名和使已有的解析缓存失效
+            self._discard()
+            self.rows_done = self.total_rows
+            self.progress(f"Bulk translate: nothing to translate in {self.csv_path}")
+            return self.summary()
+
+        source_size = os.path.getsize(self.csv_path)
+        if progress is not None:
+            source_digest = progress['source_digest']
+            source_size = progress['source_size']
+            self.rows_done = self.resumed_rows = progress['rows_done']
+            with open(self.partial_path, 'r+b') as f:
+                f.truncate(progress['output_bytes'])
+            self.progress(f"Bulk translate: resuming {self.csv_path} from row {self.rows_done}")
+        else:
+            source_digest = _prefix_digest(self.csv_path, source_size)
+
+        with open(self.csv_path, 'r', encoding=encoding, newline='') as source, \
+                open(self.partial_path, 'a' if progress else 'w', encoding=encoding, newline='') as output, \
+                ThreadPoolExecutor(max_workers=BULK_PIPELINE_DEPTH) as executor:
+            lines = _RawLines(source)
+            reader = csv.reader(lines)
+            header = next(reader, None)
+            header_raw = lines.take()
+            source_index, target_index = self._column_indexes(header)
+            if target_index is None:
+                target_index = len(header)
+                header_raw = _format_row(header + [self.target_column], header_raw)
+            if progress is None:
+                output.write(header_raw)
+
+            records = _raw_records(reader, lines)
+            for _ in zip(range(self.rows_done), (record for record in records if record[0])):
+                pass
+
+            pending = deque()
+            stopped = False
+            while not stopped:
+                chunk = self._read_chunk(records)
+                if chunk:
+                    texts = [row[source_index] for row, _ in chunk if _needs_translation(row, source_index, target_index)]
+                    pending.append((chunk, texts, executor.submit(self._translate_chunk, texts)))
+                if not pending:
+                    # 已读到文件末尾：持有写锁确认没有其他节点或进程正在追加，再替换输出文件
+                    flush_writes(self.csv_path)
+                    dedup_index = get_dedup_index(self.csv_path, self._load_strings)
+                    with file_lock(self.csv_path), dedup_index.lock:
+                        size = os.path.getsize(self.csv_path)
+                        position = source.buffer.tell()
+                        if size < position or _prefix_digest(self.csv_path, source_size) != source_digest:
+                            output.close()
+                            self._discard()
+                            raise RuntimeError(f"{self.csv_path} was rewritten during the job, run it again")
+                        if size == position:
+                            # 读取期间追加的行也已提交，以实际处理的行数为准
+                            self.total_rows = self.rows_done
+                            output.close()
+                            self._finish(dedup_index)
+                            break
+                    # 运行期间有新行追加到末尾，继续读取
+                    self.total_rows, _ = self._scan(encoding)
+                    records = _raw_records(reader, lines)
+                    continue
+                if chunk and len(pending) < BULK_PIPELINE_DEPTH:
+                    continue
+
+                chunk, texts, future = pending.popleft()
+                stopped = not self._commit_chunk(chunk, texts, future.result(), output,
+                                                 source_index, target_index, len(header), source_size, source_digest)
+            if stopped:
+                for _, _, future in pending:
+                    future.cancel()
+
+        return self.summary()
+
+    def _read_chunk(self, records):
+        """读取最多chunk_size个数据行，空行按原文保留在其中"""
+        chunk = []
+        rows = 0
+        for record in records:
+            chunk.append(record)
+            if record[0]:
+                rows += 1
+                if rows >= self.chunk_size:
+                    break
+        return chunk
+
+    def _commit_chunk(self, chunk, texts, results, output, source_index, target_index, width,
+                      source_size, source_digest):
+        """
+        将一批翻译结果写入临时文件并记录进度；翻译服务熔断时不提交该批并返回False。
+        未翻译的行按原文写回，只有填入译文的行重新生成。
+        """
+        translations = {}
+        for text, result in zip(texts, results):
+            if isinstance(result, translation_utils.TranslationError):
+                if result.kind == 'circuit_open':
+                    self.progress(f"Bulk translate: stopped, {result}. Run again to resume.")
+                    return False
+                continue
+            translations[text] = result
+
+        errors = [result for result in results if isinstance(result, translation_utils.TranslationError)]
+        if errors:
+            self.progress(f"Bulk translate: {len(errors)} rows failed in this chunk, e.g. {errors[0]}")
+        rows = 0
+        for row, raw in chunk:
+            if row and _needs_translation(row, source_index, target_index) and row[source_index] in translations:
+                row = row + [''] * (max(width, target_index + 1) - len(row))
+                row[target_index] = translations[row[source_index]]
+                raw = _format_row(row, raw)
+            rows += bool(row)
+            output.write(raw)
+        output.flush()
+        os.fsync(output.fileno())
+
+        self.rows_done += rows
+        self.translated += len(texts) - len(errors)
+        self.failed += len(errors)
+        stats.incr('bulk.rows', rows)
+        stats.incr('bulk.translated', len(texts) - len(errors))
+        stats.incr('bulk.failed', len(errors))
+        self._save_progress(source_size, source_digest, os.fstat(output.fileno()).st_size)
+        self._report()
+        return True
+
+    def _load_strings(self, path):
+        return (row.get('string') or '' for row in iter_csv_rows(path, encoding_cache.detect(path)))
+
+    def _finish(self, dedup_index):
+        """用临时文件替换输出文件并删除进度文件"""
+        # string 列未变，原地翻译且去重索引与原文件同步时直接沿用，避免重建
+        reuse_index = self.output_path == self.csv_path and dedup_index.state == csv_state(self.csv_path)
+        os.replace(self.partial_path, self.output_path)
+        if reuse_index:
+            dedup_index.record([])
+        self._discard()
+
+    def _discard(self):
+        """删除临时文件和进度文件"""
+        for path in (self.partial_path, self.progress_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Translate every row of a prompt library CSV whose target column is empty. '
+                    'Progress is checkpointed; run the same command again to resume.'
+    )
+    parser.add_argument('csv_file', help='CSV file to translate')
+    parser.add_argument('--source-column', default='string')
+    parser.add_argument('--target-column', default='zh')
+    parser.add_argument('--language', default='zh', help='target language code')
+    parser.add_argument('--translator', default=None, choices=translation_utils.available_translators())
+    parser.add_argument('--output', default=None, help='write to this file instead of replacing csv_file')
+    parser.add_argument('--chunk-size', type=int, default=BULK_CHUNK_ROWS, help='rows per checkpoint')
+    parser.add_argument('--workers', type=int, default=translation_utils.MAX_WORKERS,
+                        help='concurrent translation requests')
+    args = parser.parse_args(argv)
+
+    job = BulkTranslateJob(
+        args.csv_file, args.source_column, args.target_column, args.language, args.translator,
+        args.output, args.chunk_size, args.workers
+    )
+    try:
+        summary = job.run()
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Bulk translation error: {e}")
+        return 1
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 0 if summary['completed'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,158 @@
+import json
+import mmap
+import os
+import struct
+from .csv_index import csv_state
+from .csv_utils import ParsedCSV, file_signature
+
+# 列式缓存文件的后缀
+COLUMNAR_SUFFIX = '.columns'
+# 设为 0/false/no/off 可关闭列式缓存
+COLUMNAR_ENABLED = os.environ.get('STRING_HELPER_COLUMNAR_CACHE', '1').lower() not in ('0', 'false', 'no', 'off')
+# 小于该大小的CSV解析很快，不生成列式缓存
+COLUMNAR_MIN_BYTES = int(os.environ.get('STRING_HELPER_COLUMNAR_MIN_BYTES', 1024 * 1024))
+# 列式加载后的内存占用约为缓存文件大小的倍数（按列解码的字符串，没有行字典）
+COLUMNAR_SIZE_FACTOR = 2
+# 每个取值之后的分隔符；列中不含该字符时可一次解码整列再按分隔符拆分
+VALUE_SEPARATOR = '\x1f'
+
+# 文件头：魔数、对应CSV文件的大小和修改时间、行数、元数据长度
+_COLUMNAR_MAGIC = b'SHC1'
+_COLUMNAR_HEADER = struct.Struct('<4sQqQQ')
+_OFFSET_PAIR = struct.Struct('<QQ')
+
+
+def should_compile(path):
+    """文件较大、值得生成列式缓存时返回True"""
+    if not COLUMNAR_ENABLED:
+        return False
+    try:
+        return os.path.getsize(path) >= COLUMNAR_MIN_BYTES
+    except OSError:
+        return False
+
+
+def write_columnar(csv_path, state, rows, encoding):
+    """
+    将解析后的行写为列式缓存文件：每列一个偏移数组（uint64，行数+1项）和一段UTF-8数据。
+    state为解析前的CSV大小和修改时间，解析期间文件被修改时不写入。
+    """
+    if not rows or csv_state(csv_path) != state:
+        return False
+
+    fieldnames = [name for name in rows[0] if name is not None]
+    meta = {'encoding': encoding, 'columns': []}
+    sections = []
+    position = 0
+    for name in fieldnames:
+        values = [(row.get(name) if row else None) or '' for row in rows]
+        encoded = [(value + VALUE_SEPARATOR).encode('utf-8') for value in values]
+        offsets = [0] * (len(encoded) + 1)
+        total = 0
+        for i, value in enumerate(encoded):
+            total += len(value)
+            offsets[i + 1] = total
+        offsets_data = struct.pack(f'<{len(offsets)}Q', *offsets)
+        blob = b''.join(encoded)
+        meta['columns'].append({
+            'name': name,
+            'offsets': position,
+            'data': position + len(offsets_data),
+            'size': len(blob),
+            'delimited': not any(VALUE_SEPARATOR in value for value in values),
+        })
+        sections += [offsets_data, blob]
+        position += len(offsets_data) + len(blob)
+
+    meta_data = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+    path = csv_path + COLUMNAR_SUFFIX
+    tmp_path = path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_COLUMNAR_HEADER.pack(_COLUMNAR_MAGIC, *state, len(rows), len(meta_data)))
+            f.write(meta_data)
+            for section in sections:
+                f.write(section)
+        os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Error writing columnar cache: {str(e)}")
+        return False
+
+
+class ColumnarCSV(ParsedCSV):
+    """
+    从列式缓存文件加载的CSV：不解析CSV文本，也不构造行字典。
+    各列在首次使用时通过mmap一次解码整段数据；rows仅在调用方需要时才按列组装。
+    映射在加载时建立并保留到所有列解码完为止，缓存文件之后被替换时仍读取加载时校验过的内容。
+    """
+
+    def __init__(self, path, signature, encoding, row_count, columns, data_start, data):
+        size = sum(column['size'] for column in columns)
+        super().__init__(path, signature, None, encoding, cost=size * COLUMNAR_SIZE_FACTOR)
+        self.row_count = row_count
+        self.columns = {column['name']: column for column in columns}
+        self.fieldnames = [column['name'] for column in columns]
+        self._data_start = data_start
+        self._data = data
+        self._raw = {}
+
+    @property
+    def rows(self):
+        with self._lock:
+            if self._rows is None:
+                columns = [self.load_column(name) for name in self.fieldnames]
+                self._rows = [dict(zip(self.fieldnames, values)) for values in zip(*columns)]
+            return self._rows
+
+    def load_column(self, column):
+        with self._lock:
+            if column in self._raw:
+                return self._raw[column]
+            section = self.columns.get(column)
+            if section is None:
+                return [None] * self.row_count
+
+            data = self._data
+            start = self._data_start + section['data']
+            blob = data[start:start + section['size']]
+            if section['delimited']:
+                values = blob.decode('utf-8').split(VALUE_SEPARATOR)[:-1]
+            else:
+                offsets_start = self._data_start + section['offsets']
+                view = memoryview(blob)
+                values = []
+                for i in range(self.row_count):
+                    begin, end = _OFFSET_PAIR.unpack_from(data, offsets_start + i * 8)
+                    values.append(str(view[begin:end - len(VALUE_SEPARATOR)], 'utf-8'))
+            self._raw[column] = values
+            if len(self._raw) == len(self.columns):
+                # 所有列都已解码，不再需要映射
+                data.close()
+            return values
+
+
+def load_columnar(csv_path):
+    """加载与CSV同步的列式缓存，缓存不存在或已过期时返回None"""
+    signature = file_signature(csv_path)
+    try:
+        # 文件头、元数据和列数据都从同一个映射读取，之后缓存文件被其他进程替换也不会读到不一致的内容
+        with open(csv_path + COLUMNAR_SUFFIX, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        if len(data) < _COLUMNAR_HEADER.size:
+            raise ValueError("truncated columnar cache")
+        magic, size, mtime_ns, row_count, meta_size = _COLUMNAR_HEADER.unpack_from(data)
+        if magic != _COLUMNAR_MAGIC or (size, mtime_ns) != (signature[1], signature[0]):
+            raise ValueError("stale columnar cache")
+        meta_start = _COLUMNAR_HEADER.size
+        meta = json.loads(data[meta_start:meta_start + meta_size].decode('utf-8'))
+    except ValueError:
+        data.close()
+        return None
+
+    return ColumnarCSV(csv_path, signature, meta['encoding'], row_count, meta['columns'],
+                       _COLUMNAR_HEADER.size + meta_size, data)
@@ -0,0 +1,315 @@
+import bisect
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import struct
+import threading
+from .stats import stats
+
+# 去重索引旁路文件的后缀
+DEDUP_SUFFIX = '.dedup'
+# 每个字符串摘要的字节数
+DIGEST_SIZE = 16
+
+# 旁路文件头：魔数、对应CSV文件的大小和修改时间
+_DEDUP_MAGIC = b'SHD1'
+_DEDUP_HEADER = struct.Struct('<4sQq')
+
+# 行偏移索引旁路文件的后缀
+ROW_INDEX_SUFFIX = '.rows'
+# 小于该大小的CSV直接整体解析缓存，不建立行偏移索引
+ROW_INDEX_MIN_BYTES = int(os.environ.get('STRING_HELPER_ROW_INDEX_MIN_BYTES', 1024 * 1024))
+# 不兼容ASCII的编码中引号和换行不是单字节，无法按字节扫描记录边界
+UNINDEXABLE_ENCODINGS = ('utf-16', 'utf-32')
+
+# 旁路文件头：魔数、对应CSV文件的大小和修改时间、数据行数、元数据长度
+_ROWS_MAGIC = b'SHR1'
+_ROWS_HEADER = struct.Struct('<4sQqQQ')
+_OFFSET_PAIR = struct.Struct('<QQ')
+
+
+def string_digest(value):
+    """计算字符串的定长摘要"""
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+def csv_state(path):
+    """返回CSV文件的大小和修改时间，用于判断索引是否与文件同步"""
+    st = os.stat(path)
+    return (st.st_size, st.st_mtime_ns)
+
+
+class DedupIndex:
+    """
+    CSV文件 string 列的持久化去重索引。
+    摘要集合保存在CSV旁的 .dedup 文件中，文件头记录索引对应的CSV大小和修改时间；
+    CSV被外部修改后（大小或修改时间不一致）会自动从CSV重建。
+    写入CSV时需持有lock，并在写入前调用sync、写入后调用record。
+    """
+
+    def __init__(self, csv_path, load_strings):
+        self.csv_path = csv_path
+        self.index_path = csv_path + DEDUP_SUFFIX
+        self.lock = threading.RLock()
+        self.digests = set()
+        self.state = None
+        self._load_strings = load_strings
+
+    def __contains__(self, value):
+        return string_digest(value) in self.digests
+
+    def sync(self):
+        """确保索引与CSV一致：依次尝试内存中的索引、旁路文件，最后从CSV重建"""
+        if not os.path.exists(self.csv_path):
+            self.digests = set()
+            self.state = None
+            return
+
+        state = csv_state(self.csv_path)
+        if state == self.state or self._read(state):
+            return
+
+        self.digests = {string_digest(value) for value in self._load_strings(self.csv_path)}
+        self.state = state
+        self._write_all()
+
+    def record(self, values, reset=False):
+        """记录刚写入CSV的字符串；reset为True表示CSV已被覆写"""
+        digests = [string_digest(value) for value in values]
+        self.state = csv_state(self.csv_path)
+        if reset:
+            self.digests = set(digests)
+            self._write_all()
+            return
+
+        self.digests.update(digests)
+        try:
+            with open(self.index_path, 'r+b') as f:
+                f.seek(0, os.SEEK_END)
+                f.write(b''.join(digests))
+                f.seek(0)
+                f.write(_DEDUP_HEADER.pack(_DEDUP_MAGIC, *self.state))
+        except OSError:
+            self._write_all()
+
+    def _read(self, state):
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(_DEDUP_HEADER.size)
+                if len(header) != _DEDUP_HEADER.size:
+                    return False
+                magic, size, mtime_ns = _DEDUP_HEADER.unpack(header)
+                if magic != _DEDUP_MAGIC or (size, mtime_ns) != state:
+                    return False
+                data = f.read()
+        except OSError:
+            return False
+
+        self.digests = {data[i:i + DIGEST_SIZE] for i in range(0, len(data) - DIGEST_SIZE + 1, DIGEST_SIZE)}
+        self.state = state
+        return True
+
+    def _write_all(self):
+        tmp_path = self.index_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_DEDUP_HEADER.pack(_DEDUP_MAGIC, *(self.state or (0, 0))))
+                f.write(b''.join(self.digests))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error writing dedup index: {str(e)}")
+
+
+_dedup_indexes = {}
+_dedup_indexes_lock = threading.Lock()
+
+
+def get_dedup_index(csv_path, load_strings):
+    """获取CSV文件的去重索引（进程内按绝对路径共享）"""
+    csv_path = os.path.abspath(csv_path)
+    with _dedup_indexes_lock:
+        if csv_path not in _dedup_indexes:
+            _dedup_indexes[csv_path] = DedupIndex(csv_path, load_strings)
+        return _dedup_indexes[csv_path]
+
+
+def scan_record_offsets(data):
+    """
+    按字节扫描CSV记录的起始偏移：引号内的换行不结束记录，空行被跳过（与csv.DictReader一致）。
+    返回的列表末尾附加数据长度，作为最后一条记录的结束位置。
+    """
+    offsets = []
+    size = len(data)
+    start = pos = 0
+    quotes = 0
+    while pos < size:
+        end = data.find(b'\n', pos)
+        end = size if end == -1 else end + 1
+        quotes += data[pos:end].count(b'"')
+        pos = end
+        if quotes % 2 == 0:
+            if end - start > 2 or data[start:end].strip(b'\r\n'):
+                offsets.append(start)
+            start = end
+            quotes = 0
+    if start < size:
+        offsets.append(start)
+    offsets.append(size)
+    return offsets
+
+
+def should_index(path):
+    """文件较大、按序号取行值得建立行偏移索引时返回True"""
+    try:
+        return os.path.getsize(path) >= ROW_INDEX_MIN_BYTES
+    except OSError:
+        return False
+
+
+class RowIndex:
+    """
+    CSV文件的行偏移索引：每条记录的字节偏移，以及各列取值为空的行号。
+    保存在CSV旁的 .rows 文件中，文件头记录索引对应的CSV大小和修改时间，CSV变化后自动重建。
+    读取时通过mmap直接定位记录，按序号取行的开销与文件大小无关。
+    使用时需持有lock，并先调用sync。
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self.index_path = csv_path + ROW_INDEX_SUFFIX
+        self.lock = threading.RLock()
+        self.state = None
+        self.usable = False
+        self.row_count = 0
+        self.fieldnames = []
+        self.holes = {}
+        self._offsets_start = 0
+
+    def sync(self, encoding):
+        """确保索引与CSV一致；编码不支持或无法确定记录边界时返回False"""
+        state = csv_state(self.csv_path)
+        if state == self.state:
+            return self.usable
+        if not self._read(state):
+            with stats.timer('csv.row_index_build'):
+                self._build(state, encoding)
+        return self.usable
+
+    def count(self, column):
+        """返回指定列非空取值的数量"""
+        if column not in self.holes:
+            return 0
+        return self.row_count - len(self.holes[column])
+
+    def locate(self, column, position):
+        """将指定列第position个非空取值（从0开始）转换为行号"""
+        holes = self.holes[column]
+        row = position
+        while True:
+            # 行号row之前（含）的空行数变化时继续向后推，直到不动点
+            next_row = position + bisect.bisect_right(holes, row)
+            if next_row == row:
+                return row
+            row = next_row
+
+    def read_rows(self, row_numbers, encoding):
+        """按行号（从0开始，不含表头）读取行字典"""
+        rows = []
+        with open(self.index_path, 'rb') as index_file, open(self.csv_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for row_number in row_numbers:
+                # 第0条记录是表头
+                index_file.seek(self._offsets_start + (row_number + 1) * 8)
+                start, end = _OFFSET_PAIR.unpack(index_file.read(_OFFSET_PAIR.size))
+                # 与按文本模式读取时一致，统一换行符
+                text = data[start:end].decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+                values = next(csv.reader(io.StringIO(text, newline='')), [])
+                rows.append(dict(zip(self.fieldnames, values)))
+        return rows
+
+    def read_strings(self, column, positions, encoding):
+        """返回指定列第positions个非空取值（去除首尾空白），按positions的顺序"""
+        rows = self.read_rows([self.locate(column, position) for position in positions], encoding)
+        return [(row.get(column) or '').strip() for row in rows]
+
+    def _read(self, state):
+        try:
+            with open(self.index_path, 'rb') as f:
+                header = f.read(_ROWS_HEADER.size)
+                if len(header) != _ROWS_HEADER.size:
+                    return False
+                magic, size, mtime_ns, row_count, meta_size = _ROWS_HEADER.unpack(header)
+                if magic != _ROWS_MAGIC or (size, mtime_ns) != state:
+                    return False
+                meta = json.loads(f.read(meta_size).decode('utf-8'))
+        except (OSError, ValueError):
+            return False
+
+        self._load(state, row_count, meta, _ROWS_HEADER.size + meta_size)
+        return True
+
+    def _load(self, state, row_count, meta, offsets_start):
+        self.state = state
+        self.usable = True
+        self.row_count = row_count
+        self.fieldnames = meta['fieldnames']
+        self.holes = meta['holes']
+        self._offsets_start = offsets_start
+
+    def _build(self, state, encoding):
+        self.state = state
+        self.usable = False
+        if encoding.lower().replace('_', '-').startswith(UNINDEXABLE_ENCODINGS):
+            return
+
+        with open(self.csv_path, 'rb') as f:
+            if state[0] == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                offsets = scan_record_offsets(data)
+
+        # 按与解析缓存相同的方式完整读取一遍（跳过空行，同名列取最后一列），统计空值并校验记录数
+        row_count = 0
+        with open(self.csv_path, 'r', encoding=encoding) as f:
+            reader = csv.reader(f)
+            fieldnames = next(reader, None) or []
+            columns = {name: i for i, name in enumerate(fieldnames)}
+            holes = {name: [] for name in columns}
+            for row_count, row in enumerate(filter(None, reader), 1):
+                for name, i in columns.items():
+                    if i >= len(row) or not row[i].strip():
+                        holes[name].append(row_count - 1)
+
+        # 字段中间出现引号等情况会使字节扫描与csv模块的结果不一致，此时不使用索引
+        if len(offsets) != row_count + 2 or csv_state(self.csv_path) != state:
+            return
+
+        meta = json.dumps({'fieldnames': fieldnames, 'holes': holes}, ensure_ascii=False).encode('utf-8')
+        tmp_path = self.index_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_ROWS_HEADER.pack(_ROWS_MAGIC, *state, row_count, len(meta)))
+                f.write(meta)
+                f.write(struct.pack(f'<{len(offsets)}Q', *offsets))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error writing row index: {str(e)}")
+            return
+
+        self._load(state, row_count, {'fieldnames': fieldnames, 'holes': holes}, _ROWS_HEADER.size + len(meta))
+
+
+_row_indexes = {}
+_row_indexes_lock = threading.Lock()
+
+
+def get_row_index(csv_path):
+    """获取CSV文件的行偏移索引（进程内按绝对路径共享）"""
+    csv_path = os.path.abspath(csv_path)
+    with _row_indexes_lock:
+        if csv_path not in _row_indexes:
+            _row_indexes[csv_path] = RowIndex(csv_path)
+        return _row_indexes[csv_path]
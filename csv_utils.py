@@ -0,0 +1,395 @@
+import codecs
+import csv
+import functools
+import os
+import random
+import re
+import threading
+from collections import OrderedDict
+
+# 解析结果缓存的内存上限（字节，按文件大小估算）
+CSV_CACHE_MAX_BYTES = int(os.environ.get('STRING_HELPER_CSV_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+# 解析后的行字典约为原文件大小的倍数，用于估算内存占用
+PARSED_SIZE_FACTOR = 4
+# 超过该大小的CSV不再整体解析缓存，改为流式读取（默认为缓存上限可容纳的最大文件）
+STREAMING_THRESHOLD_BYTES = int(os.environ.get(
+    'STRING_HELPER_CSV_STREAMING_THRESHOLD', CSV_CACHE_MAX_BYTES // PARSED_SIZE_FACTOR
+))
+# chardet 兜底检测时读取的最大样本字节数
+ENCODING_SAMPLE_BYTES = 64 * 1024
+# 编码检测结果缓存的最大文件数
+ENCODING_CACHE_SIZE = 256
+# 逐块校验UTF-8时每次读取的字节数
+READ_CHUNK_BYTES = 1024 * 1024
+
+# 字节顺序标记（BOM）与对应编码，UTF-32 需在 UTF-16 之前判断
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+# 带翻译的标签格式，如“女孩 (girl)”，同时支持中文括号
+TAG_ALIAS_PATTERN = re.compile(r'^(.*?)\s*[(（]([^)）]*)[)）]$')
+# 缓存规范化结果的不同标签数量
+TAG_CACHE_SIZE = 65536
+# chardet 常把 GBK 文件识别为其子集 GB2312，统一使用超集 GB18030 以免解码失败
+ENCODING_ALIASES = {'gb2312': 'gb18030', 'gbk': 'gb18030'}
+# 不是UTF-8且chardet无法判断时使用的编码
+FALLBACK_ENCODING = 'gb18030'
+
+
+def file_signature(path):
+    """
+    返回文件签名（修改时间、大小、inode），任一变化即视为文件已修改。
+    """
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def utf8_error_offset(f):
+    """逐块严格解码文件内容，全部为合法UTF-8时返回None，否则返回第一个非法字节的偏移量"""
+    decoder = codecs.getincrementaldecoder('utf-8')('strict')
+    position = 0
+    while True:
+        chunk = f.read(READ_CHUNK_BYTES)
+        # 上一块末尾未解码完的字节会与本块一起解码，错误位置相对于两者拼接后的数据
+        buffered = len(decoder.getstate()[0])
+        try:
+            decoder.decode(chunk, final=not chunk)
+        except UnicodeDecodeError as e:
+            return position - buffered + e.start
+        if not chunk:
+            return None
+        position += len(chunk)
+
+
+def sniff_encoding(path):
+    """
+    分级检测文件编码：先检查BOM，再尝试严格UTF-8解码，最后用chardet检测有限大小的样本。
+    """
+    with open(path, 'rb') as f:
+        head = f.read(4)
+        for bom, encoding in BOMS:
+            if head.startswith(bom):
+                return encoding
+
+        f.seek(0)
+        offset = utf8_error_offset(f)
+        if offset is None:
+            return 'utf-8'
+
+        # 从第一个非UTF-8字节所在的行开始取样，避免样本只包含前面的ASCII内容
+        start = max(0, offset - ENCODING_SAMPLE_BYTES // 2)
+        f.seek(start)
+        before = f.read(offset - start)
+        line_start = before.rfind(b'\n')
+        f.seek(start + line_start + 1 if line_start >= 0 else start)
+        sample = f.read(ENCODING_SAMPLE_BYTES)
+
+    import chardet
+    encoding = (chardet.detect(sample)['encoding'] or '').lower()
+    # 严格UTF-8解码已失败，ascii 和 utf-8 都不可能正确
+    if encoding in ('', 'ascii', 'utf-8'):
+        return FALLBACK_ENCODING
+    return ENCODING_ALIASES.get(encoding, encoding)
+
+
+class EncodingCache:
+    """
+    按文件缓存编码检测结果，文件签名变化时重新检测。
+    """
+
+    def __init__(self, max_entries=ENCODING_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def detect(self, path):
+        """返回文件编码，文件未变化时直接使用缓存结果"""
+        path = os.path.abspath(path)
+        signature = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(path)
+                return entry[1]
+
+        encoding = sniff_encoding(path)
+        with self._lock:
+            self._entries[path] = (signature, encoding)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return encoding
+
+    def remember(self, path, encoding):
+        """记录刚写入文件的编码，避免追加写入后重新检测整个文件"""
+        path = os.path.abspath(path)
+        signature = file_signature(path)
+        with self._lock:
+            self._entries[path] = (signature, encoding)
+            self._entries.move_to_end(path)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+def should_stream(path):
+    """文件过大、无法放入解析缓存时返回True"""
+    try:
+        return os.path.getsize(path) > STREAMING_THRESHOLD_BYTES
+    except OSError:
+        return False
+
+
+def iter_csv_rows(path, encoding):
+    """
+    逐行读取CSV文件，按需生成行字典，内存占用与文件大小无关。
+    与整体解析和行偏移索引一致按通用换行模式读取，引号内的 \r\n 统一为 \n。
+    """
+    with open(path, 'r', encoding=encoding) as f:
+        yield from csv.DictReader(f)
+
+
+def reservoir_sample(iterable, k, rng=random):
+    """
+    蓄水池抽样：单次遍历从任意长度的序列中等概率随机选取k项（不足k项时全部返回），结果顺序随机。
+    """
+    sample = []
+    for i, item in enumerate(iterable):
+        if i < k:
+            sample.append(item)
+        else:
+            j = rng.randrange(i + 1)
+            if j < k:
+                sample[j] = item
+    rng.shuffle(sample)
+    return sample
+
+
+def select_by_indices(iterable, indices):
+    """
+    单次遍历按下标（从0开始）选取元素，按indices的顺序返回，越界下标被忽略；取到最大下标后立即停止遍历。
+    """
+    wanted = {i for i in indices if i >= 0}
+    if not wanted:
+        return []
+    last = max(wanted)
+    found = {}
+    for i, item in enumerate(iterable):
+        if i in wanted:
+            found[i] = item
+        if i >= last:
+            break
+    return [found[i] for i in indices if i in found]
+
+
+def normalize_tag(tag):
+    """规范化标签：转为小写并合并连续空白"""
+    return ' '.join(tag.lower().split())
+
+
+@functools.lru_cache(maxsize=TAG_CACHE_SIZE)
+def tag_variants(tag):
+    """
+    返回单个标签的规范化名称；形如“女孩 (girl)”的标签同时返回括号内外的名称，便于按任一语言精确匹配。
+    """
+    tag = normalize_tag(tag)
+    if not tag:
+        return ()
+    match = TAG_ALIAS_PATTERN.match(tag)
+    if not match:
+        return (tag,)
+    return (tag,) + tuple(part.strip() for part in match.groups() if part.strip())
+
+
+def split_tags(tags):
+    """将逗号分隔的标签字段拆分为规范化标签集合"""
+    result = set()
+    for tag in (tags or '').split(','):
+        result.update(tag_variants(tag))
+    return result
+
+
+def parse_filter_tags(filter_tags):
+    """解析节点输入的过滤标签（逗号分隔）"""
+    return [normalize_tag(tag) for tag in filter_tags.split(',') if tag.strip()]
+
+
+def match_tags(row_tags, filter_tag_list, mode='any', exact=False):
+    """
+    判断一行的标签集合是否满足过滤条件。
+    mode为any时任一过滤标签匹配即可，为all时需全部匹配；exact为False时按子串匹配标签。
+    """
+    if exact:
+        matches = (tag in row_tags for tag in filter_tag_list)
+    else:
+        matches = (any(tag in row_tag for row_tag in row_tags) for tag in filter_tag_list)
+    return all(matches) if mode == 'all' else any(matches)
+
+
+class TagIndex:
+    """
+    标签倒排索引：规范化标签 → 行号集合。过滤时对各标签的行号集合求交集（all）或并集（any）。
+    子串匹配在标签词表上进行，词表远小于行数，且结果按标签缓存。
+    """
+
+    def __init__(self, tag_fields):
+        # tag_fields：各行的 tags 字段，与行号一一对应
+        # 标签字段通常大量重复，按字段内容分组后每组只拆分一次
+        groups = {}
+        for i, tags in enumerate(tag_fields):
+            groups.setdefault(tags, []).append(i)
+        self.postings = {}
+        for tags, ids in groups.items():
+            for tag in split_tags(tags):
+                self.postings.setdefault(tag, set()).update(ids)
+        self._substring_matches = {}
+
+    def lookup(self, tag, exact=False):
+        """返回匹配单个标签的行号集合"""
+        if exact:
+            return self.postings.get(tag, set())
+        if tag not in self._substring_matches:
+            ids = set()
+            for key, postings in self.postings.items():
+                if tag in key:
+                    ids |= postings
+            self._substring_matches[tag] = ids
+        return self._substring_matches[tag]
+
+    def filter(self, filter_tag_list, mode='any', exact=False):
+        """返回满足过滤条件的行号集合"""
+        sets = sorted((self.lookup(tag, exact) for tag in filter_tag_list), key=len)
+        if not sets:
+            return set()
+        if mode == 'all':
+            return set.intersection(*sets)
+        return set.union(*sets)
+
+
+class ParsedCSV:
+    """
+    已解析的CSV文件：行数据、编码及解析时的文件签名。
+    标签索引和各列的规范化取值在首次使用时构建，并随解析结果一起缓存。
+    rows 在多个节点之间共享，调用方不应修改。
+    """
+
+    def __init__(self, path, signature, rows, encoding, cost=None):
+        self.path = path
+        self.signature = signature
+        self.encoding = encoding
+        self.cost = signature[1] * PARSED_SIZE_FACTOR if cost is None else cost
+        self._rows = rows
+        self._tag_index = None
+        self._columns = {}
+        self._non_empty = {}
+        self._lock = threading.RLock()
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def tag_index(self):
+        with self._lock:
+            if self._tag_index is None:
+                self._tag_index = TagIndex(self.column_values('tags'))
+            return self._tag_index
+
+    def load_column(self, column):
+        """返回指定列的原始取值列表（缺失为None），子类可从其他存储格式读取"""
+        return [row.get(column) if row else None for row in self.rows]
+
+    def column_values(self, column):
+        """返回指定列去除首尾空白后的取值列表（缺失为空字符串），与rows一一对应"""
+        with self._lock:
+            if column not in self._columns:
+                self._columns[column] = [(value or '').strip() for value in self.load_column(column)]
+            return self._columns[column]
+
+    def filter_strings(self, column, filter_tag_list=None, mode='any', exact=False):
+        """返回指定列中非空且满足标签过滤条件的字符串（新列表，按行顺序）"""
+        values = self.column_values(column)
+        if not filter_tag_list:
+            with self._lock:
+                if column not in self._non_empty:
+                    self._non_empty[column] = [value for value in values if value]
+                return list(self._non_empty[column])
+
+        ids = self.tag_index.filter(filter_tag_list, mode, exact)
+        return [values[i] for i in sorted(ids) if values[i]]
+
+
+class CSVCache:
+    """
+    进程级CSV解析缓存，以绝对路径为键，文件签名变化时自动失效，超出内存上限时按LRU淘汰。
+    """
+
+    def __init__(self, max_bytes=CSV_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def load(self, path, parser):
+        """
+        返回path对应的ParsedCSV；文件未变化时直接返回缓存，否则调用parser(path)重新解析。
+        parser需返回(rows, encoding)，或直接返回ParsedCSV（如从列式缓存文件加载）。
+        """
+        path = os.path.abspath(path)
+        signature = file_signature(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.signature == signature:
+                self._entries.move_to_end(path)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        result = parser(path)
+        entry = result if isinstance(result, ParsedCSV) else ParsedCSV(path, signature, *result)
+        with self._lock:
+            self._remove(path)
+            if entry.cost <= self.max_bytes:
+                self._entries[path] = entry
+                self._total += entry.cost
+                while self._total > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._total -= evicted.cost
+        return entry
+
+    def _remove(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None:
+            self._total -= entry.cost
+
+    def invalidate(self, path):
+        """移除指定文件的缓存"""
+        with self._lock:
+            self._remove(os.path.abspath(path))
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+            self._total = 0
+
+    def stats(self):
+        """返回命中/未命中次数、缓存文件数及估算内存占用"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'entries': len(self._entries), 'bytes': self._total}
+
+
+# 全局编码检测缓存
+encoding_cache = EncodingCache()
+
+# 全局CSV解析缓存
+csv_cache = CSVCache()
@@ -0,0 +1,286 @@
+import atexit
+import contextlib
+import csv
+import os
+import queue
+import threading
+from .csv_index import get_dedup_index, string_digest
+from .csv_utils import encoding_cache
+from .stats import stats
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# 设为 0/false/no/off 时在节点执行期间同步写入（提交后等待写入完成）
+ASYNC_WRITES = os.environ.get('STRING_HELPER_CSV_ASYNC_WRITES', '1').lower() not in ('0', 'false', 'no', 'off')
+# 刷盘策略：always 每个写入请求后 fsync，commit 每次合并提交后 fsync 一次，never 只交给操作系统
+FSYNC_POLICIES = ('always', 'commit', 'never')
+FSYNC_POLICY = os.environ.get('STRING_HELPER_CSV_FSYNC', 'commit').lower()
+if FSYNC_POLICY not in FSYNC_POLICIES:
+    FSYNC_POLICY = 'commit'
+# 后台线程空闲超过该时间（秒）后退出，下次写入时重新启动
+WRITER_IDLE_SECONDS = 60
+# 跨进程写锁文件的后缀（锁加在独立文件上，CSV被整体替换后锁依然有效）
+LOCK_SUFFIX = '.lock'
+
+
+def _lock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    elif msvcrt is not None:
+        f.seek(0)
+        while True:
+            try:
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK 重试约10秒后仍失败则抛出，继续等待
+                continue
+
+
+def _unlock(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextlib.contextmanager
+def file_lock(csv_path):
+    """
+    跨进程的CSV写锁（POSIX 上为 fcntl 建议锁，Windows 上为 msvcrt 字节锁，两者都不可用时只有进程内互斥）。
+    所有写入或替换CSV的代码都应持有该锁，多个ComfyUI进程追加同一文件时不会交错写入半行。
+    """
+    with open(csv_path + LOCK_SUFFIX, 'a+b') as f:
+        _lock(f)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+class CSVWriteError(Exception):
+    """后台写入CSV失败。failed_rows为未能写入的行；异步写入时在之后的 submit 或 flush 中抛出"""
+
+    def __init__(self, csv_path, error, failed_rows):
+        super().__init__(f"Writing {len(failed_rows)} row(s) to {csv_path} failed: {error}")
+        self.csv_path = csv_path
+        self.error = error
+        self.failed_rows = failed_rows
+
+
+class CSVWriter:
+    """
+    单个CSV文件的后台写入器。节点提交写入请求后立即返回，后台线程将排队的请求合并为一次提交：
+    先取得跨进程文件锁再持有进程内锁，以去重索引为准再次跳过重复行，写入后按刷盘策略 fsync。
+    submit 依据去重索引和尚未写入的请求预先判断哪些行会被跳过，因此节点仍能立即返回写入/跳过的行；
+    等待其他进程释放文件锁时不持有进程内锁，submit 不会因此阻塞。
+    写入失败时该批请求的摘要不再用于去重，并以 CSVWriteError 在下一次 submit（先将本次的行排队）或 flush 时抛出。
+    """
+
+    def __init__(self, csv_path, load_strings):
+        self.csv_path = csv_path
+        self.dedup_index = get_dedup_index(csv_path, load_strings)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # 已提交但尚未写入的字符串摘要；_truncating 表示队列中有覆写请求，现有文件内容不再用于去重
+        self._pending = set()
+        self._truncating = False
+        # 后台写入失败时的 CSVWriteError，下一次 submit 或 flush 时抛出
+        self._error = None
+
+    def submit(self, rows, fieldnames, append=True, check_duplicates=True):
+        """
+        提交写入请求，返回 (将写入的行, 因重复跳过的行)。
+        返回值是提交时的预判：后台提交持锁后会再次去重，期间其他进程写入的相同字符串也会被跳过，
+        因此实际写入的行可能少于返回的行（计入 csv.rows_skipped 统计）。
+        之前的请求写入失败时，本次的行照常排队，然后抛出 CSVWriteError。
+        """
+        processed_rows = []
+        skipped_rows = []
+        with self.dedup_index.lock:
+            check = check_duplicates and append
+            if check and not self._truncating:
+                self.dedup_index.sync()
+            for row in rows:
+                digest = string_digest(row['string'])
+                if check and (digest in self._pending or (not self._truncating and digest in self.dedup_index.digests)):
+                    skipped_rows.append(row)
+                    continue
+                processed_rows.append(row)
+
+            digests = {string_digest(row['string']) for row in processed_rows}
+            if append:
+                self._pending.update(digests)
+            else:
+                self._pending = digests
+                self._truncating = True
+            self._queue.put((processed_rows, fieldnames, append, check_duplicates))
+            stats.incr('csv.rows_skipped', len(skipped_rows))
+
+        self._ensure_thread()
+        if not ASYNC_WRITES:
+            self.wait()
+        self._raise_error()
+        return processed_rows, skipped_rows
+
+    def flush(self):
+        """等待已提交的请求全部写入文件，其中有写入失败时抛出该异常"""
+        self.wait()
+        self._raise_error()
+
+    def wait(self):
+        """等待已提交的请求全部写入文件（不抛出写入错误）"""
+        self._queue.join()
+
+    def _raise_error(self):
+        with self.dedup_index.lock:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error from error.error
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=f"string_helper_csv_writer:{os.path.basename(self.csv_path)}", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=WRITER_IDLE_SECONDS)
+            except queue.Empty:
+                with self._thread_lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        return
+                continue
+
+            # 上一次提交期间排队的请求合并为一次提交
+            group = [first]
+            while True:
+                try:
+                    group.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._commit(group)
+            except Exception as e:
+                print(f"Error writing to CSV: {e}")
+                stats.incr('csv.write_errors')
+                self._discard(group, e)
+            finally:
+                for _ in group:
+                    self._queue.task_done()
+
+    def _discard(self, group, error):
+        """写入失败：该组请求的摘要不再用于预判，并保留错误供下一次 submit 或 flush 抛出"""
+        with self.dedup_index.lock:
+            if self._queue.unfinished_tasks == len(group):
+                self._pending = set()
+                self._truncating = False
+            else:
+                for rows, _, _, _ in group:
+                    self._pending.difference_update(string_digest(row['string']) for row in rows)
+            failed_rows = [row for rows, _, _, _ in group for row in rows]
+            if self._error is None:
+                self._error = CSVWriteError(self.csv_path, error, failed_rows)
+            else:
+                # 尚未报告的失败合并到同一个异常中
+                self._error = CSVWriteError(self.csv_path, self._error.error, self._error.failed_rows + failed_rows)
+
+    def _commit(self, group):
+        """在一次加锁中依次写入一组请求（先取得跨进程文件锁，再持有进程内锁）"""
+        with file_lock(self.csv_path), self.dedup_index.lock, stats.timer('csv.write'):
+            exists = os.path.exists(self.csv_path)
+            size_before = os.path.getsize(self.csv_path) if exists else 0
+            encoding = encoding_cache.detect(self.csv_path) if exists else 'utf-8'
+            # 追加前同步去重索引，纳入其他进程写入的行
+            if exists and group[0][2]:
+                self.dedup_index.sync()
+
+            written = skipped = 0
+            f = None
+            try:
+                for rows, fieldnames, append, check_duplicates in group:
+                    if f is None or not append:
+                        if f is not None:
+                            f.close()
+                        if not append or not os.path.exists(self.csv_path):
+                            f = open(self.csv_path, 'w', encoding=encoding, newline='')
+                            csv.DictWriter(f, fieldnames=fieldnames).writeheader()
+                            self.dedup_index.record([], reset=True)
+                            size_before = 0
+                        else:
+                            f = open(self.csv_path, 'a', encoding=encoding, newline='')
+
+                    writer = csv.DictWriter(f, fieldnames=fieldnames)
+                    # 其他进程可能已写入相同的字符串，以持锁后的去重索引为准
+                    if check_duplicates and append:
+                        kept = [row for row in rows if row['string'] not in self.dedup_index]
+                        skipped += len(rows) - len(kept)
+                        rows = kept
+                    writer.writerows(rows)
+                    written += len(rows)
+                    f.flush()
+                    if FSYNC_POLICY == 'always':
+                        os.fsync(f.fileno())
+                    self.dedup_index.record([row['string'] for row in rows])
+                if FSYNC_POLICY == 'commit':
+                    os.fsync(f.fileno())
+            finally:
+                if f is not None:
+                    f.close()
+
+            encoding_cache.remember(self.csv_path, encoding)
+            if self._queue.unfinished_tasks == len(group):
+                # 队列中没有其他请求时，预判用的摘要已全部落入去重索引
+                self._pending = set()
+                self._truncating = False
+
+        if stats.enabled:
+            stats.incr('csv.group_commits')
+            stats.incr('csv.rows_written', written)
+            stats.incr('csv.rows_skipped', skipped)
+            stats.incr('csv.bytes_written', os.path.getsize(self.csv_path) - size_before)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_csv_writer(csv_path, load_strings):
+    """获取CSV文件的后台写入器（进程内按绝对路径共享）"""
+    csv_path = os.path.abspath(csv_path)
+    with _writers_lock:
+        if csv_path not in _writers:
+            _writers[csv_path] = CSVWriter(csv_path, load_strings)
+        return _writers[csv_path]
+
+
+def flush_writes(csv_path=None):
+    """
+    等待指定CSV（为None时所有CSV）已提交的写入完成；读取刚写入的文件前调用。
+    写入错误留给提交写入的一方，这里不抛出。
+    """
+    with _writers_lock:
+        if csv_path is None:
+            writers = list(_writers.values())
+        else:
+            writer = _writers.get(os.path.abspath(csv_path))
+            writers = [writer] if writer is not None else []
+    for writer in writers:
+        writer.wait()
+
+
+atexit.register(flush_writes)
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import sqlite3
+import threading
+
+# 游标数据库默认位置（插件目录下的 cache 目录），可通过环境变量覆盖
+CURSOR_PATH = os.environ.get(
+    'STRING_HELPER_CURSOR_STORE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'cursors.sqlite3')
+)
+# 等待其他进程释放数据库锁的最长时间（秒）
+LOCK_TIMEOUT = 30
+
+
+def make_cursor_key(*parts):
+    """由列表来源（如CSV路径、列名、过滤条件或列表内容）生成定长的游标键"""
+    payload = '\x1f'.join(str(part) for part in parts)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CursorStore:
+    """
+    基于SQLite的顺序选择游标，多个ComfyUI进程共享同一数据库文件。
+    advance在一个写事务内完成读取和前移，多个进程并发遍历同一列表时不会取到相同位置，重启后从上次的位置继续。
+    """
+
+    def __init__(self, path=CURSOR_PATH, timeout=LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if self.path != ':memory:' and directory:
+                os.makedirs(directory, exist_ok=True)
+            # 自动提交模式，由advance显式控制事务
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute('CREATE TABLE IF NOT EXISTS cursors (key TEXT PRIMARY KEY, position INTEGER NOT NULL)')
+            self._conn = conn
+        return self._conn
+
+    def advance(self, key, count=None):
+        """
+        原子地取出游标当前位置并前移一位，返回取出的位置；count不为None时位置对count取模。
+        数据库不可用时返回None。
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                # IMMEDIATE事务在读取前即获取写锁，保证取出与前移之间不会被其他进程插入
+                conn.execute('BEGIN IMMEDIATE')
+                try:
+                    row = conn.execute('SELECT position FROM cursors WHERE key = ?', (key,)).fetchone()
+                    position = row[0] if row else 0
+                    if count:
+                        position %= count
+                    conn.execute(
+                        'INSERT OR REPLACE INTO cursors (key, position) VALUES (?, ?)', (key, position + 1)
+                    )
+                    conn.execute('COMMIT')
+                except BaseException:
+                    conn.execute('ROLLBACK')
+                    raise
+                return position
+        except sqlite3.Error as e:
+            print(f"Cursor store error: {str(e)}")
+            return None
+
+    def wrap(self, key, count):
+        """列表长度在取位置后才得知时（流式读取），将越界的游标折回count以内"""
+        try:
+            with self._lock:
+                self._connect().execute(
+                    'UPDATE cursors SET position = position % ? WHERE key = ?', (count, key)
+                )
+        except sqlite3.Error as e:
+            print(f"Cursor store error: {str(e)}")
+
+    def reset(self, key=None):
+        """重置指定游标，key为None时重置全部"""
+        with self._lock:
+            conn = self._connect()
+            if key is None:
+                conn.execute('DELETE FROM cursors')
+            else:
+                conn.execute('DELETE FROM cursors WHERE key = ?', (key,))
+
+
+# 全局游标存储
+cursors = CursorStore()
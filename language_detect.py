@@ -0,0 +1,139 @@
+import bisect
+import re
+
+# Unicode区间与文字系统（按起点排序）
+SCRIPT_RANGES = (
+    (0x0041, 0x024F, 'latin'),
+    (0x0370, 0x03FF, 'greek'),
+    (0x0400, 0x052F, 'cyrillic'),
+    (0x0590, 0x05FF, 'hebrew'),
+    (0x0600, 0x06FF, 'arabic'),
+    (0x0E00, 0x0E7F, 'thai'),
+    (0x1100, 0x11FF, 'hangul'),
+    (0x1E00, 0x1EFF, 'latin'),
+    (0x3040, 0x30FF, 'kana'),
+    (0x3130, 0x318F, 'hangul'),
+    (0x31F0, 0x31FF, 'kana'),
+    (0x3400, 0x4DBF, 'han'),
+    (0x4E00, 0x9FFF, 'han'),
+    (0xAC00, 0xD7AF, 'hangul'),
+    (0xF900, 0xFAFF, 'han'),
+    (0xFF21, 0xFF5A, 'latin'),
+    (0xFF66, 0xFF9F, 'kana'),
+    (0x20000, 0x2FA1F, 'han'),
+)
+_RANGE_STARTS = [start for start, _, _ in SCRIPT_RANGES]
+
+# 只有一种语言使用的文字系统
+SCRIPT_LANGUAGES = {
+    'hangul': 'ko', 'greek': 'el', 'cyrillic': 'ru', 'hebrew': 'he', 'arabic': 'ar', 'thai': 'th',
+}
+# 假名占汉字和假名总数的比例超过该值时判定为日语
+KANA_RATIO = 0.1
+
+# 拉丁字母语言的常见虚词与特征字母，用于区分英语和其他欧洲语言；没有任何特征时无法判断语言
+LATIN_STOPWORDS = {
+    'en': {'the', 'and', 'of', 'with', 'in', 'on', 'a', 'an', 'is', 'are', 'to', 'her', 'his', 'she', 'he',
+           'at', 'by', 'from', 'for', 'wearing', 'sitting', 'standing'},
+    'es': {'el', 'la', 'los', 'las', 'y', 'de', 'del', 'con', 'en', 'un', 'una', 'es', 'por', 'para', 'su',
+           'sus', 'que', 'mujer', 'hombre'},
+    'fr': {'le', 'la', 'les', 'et', 'de', 'des', 'du', 'avec', 'un', 'une', 'est', 'sur', 'dans', 'pour',
+           'sa', 'son', 'ses', 'femme', 'homme'},
+    'de': {'der', 'die', 'das', 'und', 'mit', 'ein', 'eine', 'ist', 'auf', 'im', 'von', 'zu', 'den', 'dem',
+           'ihr', 'sein', 'frau', 'mann'},
+}
+LATIN_MARKERS = {
+    'es': set('ñ¿¡'),
+    'fr': set('çœèêëîïôûù'),
+    'de': set('ßäöü'),
+}
+# 含字母但无法判断语言（如没有虚词和特征字母的拉丁字母文本），这类文本总是发送翻译
+UNDETERMINED = 'und'
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+# 切分混合语言文本时使用的分隔符：逗号、顿号、分号、换行和句末标点
+_PIECE_PATTERN = re.compile(r'[^,，、;；\n。！？!?]+|[,，、;；\n。！？!?]+')
+
+
+def script_of(char):
+    """返回字符所属的文字系统，非字母字符返回None"""
+    if not char.isalpha():
+        return None
+    code = ord(char)
+    i = bisect.bisect_right(_RANGE_STARTS, code) - 1
+    if i >= 0 and code <= SCRIPT_RANGES[i][1]:
+        return SCRIPT_RANGES[i][2]
+    return 'other'
+
+
+def script_histogram(text):
+    """统计文本中各文字系统的字母数量"""
+    histogram = {}
+    if text.isascii():
+        count = sum(1 for char in text if char.isalpha())
+        if count:
+            histogram['latin'] = count
+        return histogram
+    for char in text:
+        script = script_of(char)
+        if script:
+            histogram[script] = histogram.get(script, 0) + 1
+    return histogram
+
+
+def single_script(text):
+    """文本的字母只属于一种文字系统时返回该文字系统，否则（含不含字母时）返回None"""
+    if text.isascii():
+        return 'latin' if any(char.isalpha() for char in text) else None
+    histogram = script_histogram(text)
+    return next(iter(histogram)) if len(histogram) == 1 else None
+
+
+def _latin_language(text):
+    text = text.lower()
+    words = _WORD_PATTERN.findall(text)
+    scores = {language: sum(word in stopwords for word in words)
+              for language, stopwords in LATIN_STOPWORDS.items()}
+    if not text.isascii():
+        for language, markers in LATIN_MARKERS.items():
+            scores[language] += 2 * sum(char in markers for char in text)
+    best = max(scores, key=scores.get)
+    if scores[best] == 0:
+        return UNDETERMINED
+    return best if scores[best] > scores['en'] else 'en'
+
+
+def detect_language(text):
+    """
+    按文字系统直方图判断文本语言，返回 en/zh/ja/ko/es/fr/de 等语言代码；不含字母时返回None。
+    拉丁字母文本通过常见虚词和特征字母区分英语与西、法、德语，没有任何特征时返回UNDETERMINED；
+    其他文字系统直接对应语言。
+    """
+    histogram = script_histogram(text)
+    if not histogram:
+        return None
+    script = max(histogram, key=histogram.get)
+    kana = histogram.get('kana', 0)
+    if script in ('han', 'kana'):
+        return 'ja' if kana > KANA_RATIO * (kana + histogram.get('han', 0)) else 'zh'
+    if script == 'latin':
+        return _latin_language(text)
+    return SCRIPT_LANGUAGES.get(script, 'other')
+
+
+def normalize_language(language):
+    """统一语言代码，如 zh-CN、zh-Hans 都视为 zh"""
+    return language.replace('_', '-').split('-')[0].lower()
+
+
+def is_language(text, language):
+    """文本确定已是指定语言（或不含需要翻译的字母）时返回True，无法判断语言时返回False"""
+    detected = detect_language(text)
+    return detected is None or detected == normalize_language(language)
+
+
+def split_by_language(text):
+    """
+    按逗号、分号、换行和句末标点将文本切分为片段，返回[(片段, 语言代码或None)]，片段拼接后等于原文。
+    """
+    return [(piece, detect_language(piece)) for piece in _PIECE_PATTERN.findall(text)]
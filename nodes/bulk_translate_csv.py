@@ -0,0 +1,70 @@
+import json
+import os
+from .lib import LazyModule
+from .string_list import BaseStringList
+from ..csv_utils import file_signature
+
+# Loaded on first use to keep ComfyUI startup fast
+translation_utils = LazyModule('..translation_utils', __package__)
+bulk_translate = LazyModule('..bulk_translate', __package__)
+
+class BulkTranslateCSV:
+    """
+    A node that fills the empty target column of a whole CSV prompt library.
+    Rows are streamed and translated in checkpointed chunks into a temporary file that
+    replaces the CSV when the job completes; re-running after an interruption resumes
+    from the last committed chunk.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "csv_file": ("STRING", {
+                    "default": "output/string_list_output.csv",
+                    "placeholder": "Path to the CSV file to translate"
+                }),
+                "source_column": ("STRING", {"default": "string"}),
+                "target_column": ("STRING", {"default": "zh"}),
+                "target_language": (["en", "zh", "es", "fr", "de", "ja", "ko"], {"default": "zh"}),
+                "chunk_size": ("INT", {"default": 200, "min": 1, "max": 10000}),
+            },
+            "optional": {
+                "translator": (translation_utils.available_translators(), {
+                    "default": translation_utils.DEFAULT_TRANSLATOR
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("report",)
+    OUTPUT_NODE = True
+    FUNCTION = "translate_csv"
+    CATEGORY = "String Helper"
+
+    @classmethod
+    def IS_CHANGED(cls, csv_file, **kwargs):
+        csv_path = BaseStringList.get_absolute_path(csv_file)
+        # A stopped job leaves the CSV as it was plus a progress file; always run again to resume it
+        if os.path.exists(csv_path + bulk_translate.PROGRESS_SUFFIX):
+            return float("nan")
+        # Otherwise run again whenever the CSV changes, e.g. after new rows were appended
+        try:
+            return str(file_signature(csv_path))
+        except OSError:
+            return float("nan")
+
+    def translate_csv(self, csv_file, source_column, target_column, target_language, chunk_size, translator=None):
+        """Translate every row whose target column is empty and return the job summary as JSON"""
+        try:
+            job = bulk_translate.BulkTranslateJob(
+                BaseStringList.get_absolute_path(csv_file), source_column, target_column,
+                target_language, translator, chunk_size=chunk_size
+            )
+            summary = job.run()
+        except Exception as e:
+            print(f"Bulk translation error: {str(e)}")
+            summary = {'error': str(e)}
+
+        text = json.dumps(summary, ensure_ascii=False, indent=2)
+        return {"ui": {"text": (text,)}, "result": (text,)}
@@ -1,3 +1,6 @@
+import importlib
+
+
 class AnyType(str):
     """
     A class representing any type in ComfyUI nodes.
@@ -11,3 +14,22 @@ class AnyType(str):
         return (ANY, {})
 
 ANY = AnyType("*")
+
+
+class LazyModule:
+    """
+    A proxy that imports the target module on first attribute access.
+    Keeps heavy dependencies (translators, chardet) out of ComfyUI's startup path.
+    """
+    def __init__(self, name, package=None):
+        self._name = name
+        self._package = package
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name, self._package)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
@@ -1,4 +1,7 @@
-from ..translation_utils import translate_texts
+from .lib import LazyModule
+
+# Loaded on first use to keep ComfyUI startup fast
+translation_utils = LazyModule('..translation_utils', __package__)
 
 class ShowTranslateString:
     @classmethod
@@ -11,6 +14,11 @@ class ShowTranslateString:
                 "target_language": (["en", "zh", "es", "fr", "de", "ja", "ko"], {
                     "default": "zh"
                 })
+            },
+            "optional": {
+                "translator": (translation_utils.available_translators(), {
+                    "default": translation_utils.DEFAULT_TRANSLATOR
+                })
             }
         }
 
@@ -21,8 +29,8 @@ class ShowTranslateString:
     FUNCTION = "translate"
     CATEGORY = "String Helper"
 
-    def translate(self, input_strings, target_language):
-        """Translate the input strings to the target language using Bing translator"""
+    def translate(self, input_strings, target_language, translator=None):
+        """Translate the input strings to the target language using the selected translator"""
         # Ensure input_strings is a list
         if isinstance(input_strings, str):
             strings_to_translate = [input_strings]
@@ -32,6 +40,6 @@ class ShowTranslateString:
             strings_to_translate = [str(input_strings)]
         
         #逐个翻译每个字符串
-        translated_strings = translate_texts(strings_to_translate, target_language)
+        translated_strings = translation_utils.translate_texts(strings_to_translate, target_language, translator)
         
         return {"ui": {"translated_strings": translated_strings}, "result": (translated_strings,)}
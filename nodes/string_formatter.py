@@ -1,4 +1,97 @@
 from .lib import ANY
+from ..stats import stats
+from ..template_engine import parse_template
+import functools
+import itertools
+import os
+
+# Number of compiled templates kept in memory
+TEMPLATE_CACHE_SIZE = 256
+# Hard cap on the number of strings produced by one expansion
+EXPAND_MAX_OUTPUTS = 100000
+# Force the sandboxed template engine, e.g. on shared servers
+FORCE_SAFE_TEMPLATES = os.environ.get('STRING_HELPER_SAFE_TEMPLATES', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def to_fstring_source(template):
+    """
+    Wrap a template in a triple-quoted f-string literal.
+    Quotes in the literal text are escaped so templates containing ''' (or ending
+    with a quote) still compile; replacement fields are copied verbatim.
+    """
+    source = []
+    i = 0
+    length = len(template)
+    while i < length:
+        char = template[i]
+        if char == '{' and template.startswith('{{', i):
+            source.append('{{')
+            i += 2
+        elif char == '{':
+            # Copy the replacement field up to its matching closing brace
+            depth = 0
+            quote = None
+            start = i
+            while i < length:
+                char = template[i]
+                if quote:
+                    if char == quote:
+                        quote = None
+                elif char in '\'"':
+                    quote = char
+                elif char in '{[(':
+                    depth += 1
+                elif char in '}])':
+                    depth -= 1
+                    if depth == 0:
+                        i += 1
+                        break
+                i += 1
+            source.append(template[start:i])
+        elif char == '\\':
+            # Keep escape sequences intact, including escaped quotes
+            source.append(template[i:i + 2])
+            i += 2
+        elif char == "'":
+            source.append("\\'")
+            i += 1
+        else:
+            source.append(char)
+            i += 1
+    return "f'''" + ''.join(source) + "'''"
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(template):
+    """Compile a template once into an f-string code object, cached by template text"""
+    return compile(to_fstring_source(template), '<template>', 'eval')
+
+
+def get_renderer(template, template_engine="f-string"):
+    """Return a function rendering the template with an argument dict, using the cached compiled form"""
+    if template_engine == "safe" or FORCE_SAFE_TEMPLATES:
+        return parse_template(template).render
+    code = compile_template(template)
+    return lambda args: eval(code, args)
+
+
+def expand_args(args_dict, mode="product", max_outputs=EXPAND_MAX_OUTPUTS):
+    """
+    Lazily yield argument dicts for the combinations of list-valued arguments.
+    "product" yields the cartesian product, "zip" pairs lists element-wise and stops
+    at the shortest one. Scalar arguments stay constant; at most max_outputs dicts are yielded.
+    """
+    names = list(args_dict)
+    is_list = [isinstance(value, (list, tuple)) for value in args_dict.values()]
+    if mode == "zip" and any(is_list):
+        combinations = zip(*[value if listed else itertools.repeat(value)
+                             for value, listed in zip(args_dict.values(), is_list)])
+    else:
+        combinations = itertools.product(*[value if listed else [value]
+                                           for value, listed in zip(args_dict.values(), is_list)])
+    for combination in itertools.islice(combinations, min(max_outputs, EXPAND_MAX_OUTPUTS)):
+        yield dict(zip(names, combination))
+
 
 class StringFormatter:
     """
@@ -20,18 +113,24 @@ class StringFormatter:
                 }),
             },
             "optional": {
-                **{f"arg{i}": (ANY, {"default": None}) for i in range(1, 11)}
+                **{f"arg{i}": (ANY, {"default": None}) for i in range(1, 11)},
+                "expand_mode": (["off", "product", "zip"], {"default": "off"}),
+                "template_engine": (["f-string", "safe"], {"default": "f-string"}),
+                "max_outputs": ("INT", {"default": 1000, "min": 1, "max": EXPAND_MAX_OUTPUTS}),
             }
         }
     
-    RETURN_TYPES = ("STRING",)
+    RETURN_TYPES = ("STRING", "LIST", "STRING",)
     FUNCTION = "format_string"
     CATEGORY = "String Helper"
-    RETURN_NAMES = ("formatted_string",)
+    RETURN_NAMES = ("formatted_string", "formatted_list", "formatted_strings",)
+    OUTPUT_IS_LIST = (False, False, True)
     
     @classmethod
+    @stats.timed('formatter.format')
     def format_string(cls, template, arg1=None, arg2=None, arg3=None, arg4=None, 
-                     arg5=None, arg6=None, arg7=None, arg8=None, arg9=None, arg10=None):
+                     arg5=None, arg6=None, arg7=None, arg8=None, arg9=None, arg10=None,
+                     expand_mode="off", max_outputs=1000, template_engine="f-string"):
         try:
             # Create a dictionary of all arguments
             args_dict = {
@@ -41,8 +140,17 @@ class StringFormatter:
             }
             
             # Format string using f-string style with the arguments dictionary
-            result = eval(f"f'''{template}'''", args_dict)
-            return {"ui": {"formatted_string": (result,)}, "result": (result,)}
+            render = get_renderer(template, template_engine)
+            if expand_mode == "off":
+                result = render(args_dict)
+                results = [result]
+            else:
+                # Render every combination of list arguments through the same compiled template
+                results = [render(args) for args in expand_args(args_dict, expand_mode, max_outputs)]
+                result = "\n".join(results)
+            stats.incr('formatter.outputs', len(results))
+            return {"ui": {"formatted_string": (result,)}, "result": (result, results, results)}
         except Exception as e:
+            stats.incr('formatter.errors')
             error_msg = f"Format Error: {str(e)}"
-            return {"ui": {"formatted_string": (error_msg,)}, "result": (error_msg,)}
\ No newline at end of file
+            return {"ui": {"formatted_string": (error_msg,)}, "result": (error_msg, [error_msg], [error_msg])}
@@ -0,0 +1,54 @@
+import json
+from .lib import ANY, LazyModule
+from ..csv_utils import csv_cache
+from ..stats import stats
+
+# Loaded on first use to keep ComfyUI startup fast
+translation_utils = LazyModule('..translation_utils', __package__)
+
+class StringHelperStats:
+    """
+    A node that reports the timers and counters collected by the String Helper nodes
+    (translation requests, CSV reads/writes, matcher and formatter calls) as JSON.
+    Collection is off by default; running this node with enable=True switches it on
+    for the following executions, as does setting STRING_HELPER_STATS=1.
+    """
+
+    @classmethod
+    def INPUT_TYPES(cls):
+        return {
+            "required": {
+                "enable": ("BOOLEAN", {"default": True}),
+                "reset": ("BOOLEAN", {"default": False}),
+            },
+            "optional": {
+                "trigger": (ANY, {}),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("stats_json",)
+    OUTPUT_NODE = True
+    FUNCTION = "report"
+    CATEGORY = "String Helper"
+
+    @classmethod
+    def IS_CHANGED(cls, **kwargs):
+        # The counters change between runs without any input changing; NaN never compares equal
+        return float("nan")
+
+    def report(self, enable, reset, trigger=None):
+        """Return the current stats summary, optionally clearing it afterwards"""
+        summary = stats.summary()
+        summary['caches'] = {'csv': csv_cache.stats()}
+        try:
+            summary['caches']['translation'] = translation_utils.translation_cache.stats()
+        except Exception as e:
+            print(f"Error reading translation cache stats: {str(e)}")
+
+        stats.enable(enable)
+        if reset:
+            stats.reset()
+
+        text = json.dumps(summary, ensure_ascii=False, indent=2)
+        return {"ui": {"text": (text,)}, "result": (text,)}
@@ -1,8 +1,17 @@
 import random
 import os
 import csv
-import chardet
-from ..translation_utils import translate_texts
+import itertools
+from .lib import LazyModule
+from ..csv_columnar import load_columnar, should_compile, write_columnar
+from ..csv_index import csv_state, get_row_index, should_index
+from ..csv_utils import csv_cache, encoding_cache, file_signature, iter_csv_rows, match_tags, parse_filter_tags, reservoir_sample, select_by_indices, should_stream, split_tags
+from ..csv_writer import CSVWriteError, flush_writes, get_csv_writer
+from ..stats import stats
+
+# Loaded on first use to keep ComfyUI startup fast
+translation_utils = LazyModule('..translation_utils', __package__)
+cursor_store = LazyModule('..cursor_store', __package__)
 
 class BaseStringList:
     """Base class for string list operations"""
@@ -12,29 +21,66 @@ class BaseStringList:
 
     @staticmethod
     def get_encoding(csv_path):
-        """Read CSV file and detect encoding"""
+        """Detect CSV file encoding (BOM, strict UTF-8, then sampled chardet), cached per file"""
         try:
-            with open(csv_path, 'rb') as f:
-                raw_data = f.read()
-                result = chardet.detect(raw_data)
-                return result['encoding']
+            with stats.timer('csv.encoding_detect'):
+                return encoding_cache.detect(csv_path)
         except Exception as e:
             print(f"Error detecting encoding: {str(e)}")
             return 'utf-8'
 
-    def read_csv_with_encoding(self, csv_path):
-        """Read CSV file and detect encoding"""
+    def parse_csv(self, csv_path):
+        """Detect encoding and parse all rows of a CSV file"""
+        encoding = self.get_encoding(csv_path)
+        with stats.timer('csv.parse'), open(csv_path, 'r', encoding=encoding) as f:
+            reader = csv.DictReader(f)
+            rows = list(reader)
+        if stats.enabled:
+            stats.incr('csv.rows_read', len(rows))
+            stats.incr('csv.bytes_read', os.path.getsize(csv_path))
+        return rows, encoding
+
+    def compile_csv(self, csv_path):
+        """Load a large CSV from its columnar cache file, regenerating the cache from a full parse when stale"""
+        if not should_compile(csv_path):
+            return self.parse_csv(csv_path)
+
+        parsed = load_columnar(csv_path)
+        if parsed is not None:
+            encoding_cache.remember(csv_path, parsed.encoding)
+            stats.incr('csv.columnar_loads')
+            return parsed
+
+        state = csv_state(csv_path)
+        rows, encoding = self.parse_csv(csv_path)
+        with stats.timer('csv.columnar_write'):
+            write_columnar(csv_path, state, rows, encoding)
+        return rows, encoding
+
+    def load_csv(self, csv_path):
+        """Return the cached ParsedCSV for a file, parsing it only when the file has changed"""
         try:
-            encoding = self.get_encoding(csv_path)
-            with open(csv_path, 'r', encoding=encoding) as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-                return rows, encoding
+            return csv_cache.load(csv_path, self.compile_csv)
         except Exception as e:
             print(f"Error reading CSV file: {str(e)}")
+            return None
+
+    def read_csv_with_encoding(self, csv_path):
+        """Read CSV file and detect encoding, reusing the cached parse while the file is unchanged"""
+        parsed = self.load_csv(csv_path)
+        if parsed is None:
             return None, 'utf-8'
+        return parsed.rows, parsed.encoding
+
+    def read_csv_strings(self, csv_path):
+        """Read the 'string' column of a CSV file"""
+        parsed = self.load_csv(csv_path)
+        if parsed is None:
+            return []
+        return [value or '' for value in parsed.load_column('string')]
 
-    def get_absolute_path(self, file_path):
+    @staticmethod
+    def get_absolute_path(file_path):
         """Convert relative path to absolute path based on project root"""
         if os.path.isabs(file_path):
             return file_path
@@ -49,6 +95,13 @@ class BaseStringList:
     def save_to_csv(self, csv_file, rows_to_write, append_mode=True, check_duplicates=True):
         """Common method to save data to CSV file
         
+        Rows are handed to the file's background writer, which appends them under a
+        cross-process file lock; duplicates are decided up front so the node can return
+        immediately. The writer checks duplicates again under the lock, so rows another
+        process wrote in the meantime are skipped even though they are reported as processed.
+        A failed background write raises CSVWriteError from the next call, after that call's
+        rows have been queued.
+
         Args:
             csv_file: Path to the CSV file
             rows_to_write: List of dictionaries with keys 'string', 'zh', and 'tags'
@@ -60,59 +113,38 @@ class BaseStringList:
         """
         try:
             csv_path = self.get_absolute_path(csv_file)
-            processed_rows = []
-            skipped_rows = []
 
             # Ensure the output directory exists
             os.makedirs(os.path.dirname(csv_path), exist_ok=True)
 
-            # Read existing data and check for duplicates
-            existing_strings = set()
-            current_encoding = 'utf-8'
-            if os.path.exists(csv_path):
-                rows, encoding = self.read_csv_with_encoding(csv_path)
-                if rows is not None:
-                    existing_strings = {row['string'] for row in rows}
-                    current_encoding = encoding
-
-            # Determine write mode
-            if not os.path.exists(csv_path):
-                mode = 'w'
-            else:
-                mode = 'a' if append_mode else 'w'
-
-            with open(csv_path, mode, encoding=current_encoding, newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['string', 'zh', 'tags'])
-                
-                # Write header if it's a new file or overwriting
-                if mode == 'w':
-                    writer.writeheader()
-                    existing_strings.clear()
-
-                # Write data
-                for row in rows_to_write:
-                    # Skip if string already exists in append mode
-                    if check_duplicates and mode == 'a' and row['string'] in existing_strings:
-                        skipped_rows.append(row)
-                        continue
-
-                    writer.writerow(row)
-                    processed_rows.append(row)
-
-            return processed_rows, skipped_rows
+            writer = get_csv_writer(csv_path, self.read_csv_strings)
+            return writer.submit(rows_to_write, ['string', 'zh', 'tags'], append_mode, check_duplicates)
 
+        except CSVWriteError:
+            # Rows were lost by an earlier write; this call's rows are queued, so report a real error
+            raise
         except Exception as e:
             print(f"Error writing to CSV: {e}")
+            stats.incr('csv.write_errors')
             return [], rows_to_write
 
-    def translate_strings(self, strings):
-        """Translate a list of strings to English using Bing translator with auto language detection"""
+    def translate_strings(self, strings, translator=None):
+        """
+        Translate a list of strings to English using the selected translator with auto language detection.
+        Strings that fail to translate are kept as they are.
+        """
         try:
-            translated_strings = translate_texts(strings, 'en')
-            return translated_strings
+            results = translation_utils.translate_texts_detailed(strings, 'en', translator)
         except Exception as e:
             print(f"Translation error: {str(e)}")
             return strings
+        translated_strings = []
+        for string, result in zip(strings, results):
+            if isinstance(result, translation_utils.TranslationError):
+                print(f"Translation error: {str(result)}")
+                result = string
+            translated_strings.append(result)
+        return translated_strings
 
     def get_selected_strings(self, all_strings, numbers_str):
         """Get strings by their numbers (1-based)"""
@@ -125,7 +157,39 @@ class BaseStringList:
             print("Invalid number format. Please use comma-separated numbers (e.g., '1,3,5')")
             return []
 
-    def process_string_selection(self, input_strings, p3_select_random_count, p1_select_by_numbers, translate_output, p2_select_sequential=False, string_list=None):
+    def next_sequential_index(self, count=None, cursor_key=None):
+        """Return the next sequential position and advance the cursor
+
+        With a cursor_key the cursor lives in the shared cursor store, so it survives restarts and
+        workers walking the same list never get the same position. Without a count (streamed lists)
+        the position may run past the end and has to be folded back with wrap_sequential_index.
+        """
+        if cursor_key is not None:
+            index = cursor_store.cursors.advance(cursor_key, count)
+            if index is not None:
+                return index
+        index = self.current_index % count if count else self.current_index
+        self.current_index = index + 1
+        return index
+
+    def wrap_sequential_index(self, index, count, cursor_key=None):
+        """Fold a sequential position that ran past the end of a streamed list back into range"""
+        index %= count
+        if cursor_key is not None:
+            cursor_store.cursors.wrap(cursor_key, count)
+        self.current_index = index + 1
+        return index
+
+    @staticmethod
+    def is_deterministic_selection(p1_select_by_numbers, p2_select_sequential, p3_select_random_count):
+        """True when the selection depends only on the inputs, not on randomness or the sequential cursor"""
+        if p1_select_by_numbers.strip():
+            return True
+        if p2_select_sequential:
+            return False
+        return p3_select_random_count in (-1, 0)
+
+    def process_string_selection(self, input_strings, p3_select_random_count, p1_select_by_numbers, translate_output, p2_select_sequential=False, string_list=None, translator=None, cursor_key=None):
         """Process string selection with common logic
         
         Args:
@@ -135,12 +199,18 @@ class BaseStringList:
             p3_select_random_count: Priority 3 - Number of strings to select randomly
             translate_output: Whether to translate the selected strings
             string_list: Optional additional strings to append
+            translator: Name of the translation backend (defaults to DEFAULT_TRANSLATOR)
+            cursor_key: Key of the shared sequential cursor (defaults to the node's own index)
         """
         # Early return if no input strings
         if not input_strings:
             return ([], [])
 
-        # Process string selection
+        selected_input_strings = self.select_strings(input_strings, p3_select_random_count, p1_select_by_numbers, p2_select_sequential, cursor_key)
+        return self.finalize_selection(selected_input_strings, translate_output, string_list, translator)
+
+    def select_strings(self, input_strings, p3_select_random_count, p1_select_by_numbers, p2_select_sequential=False, cursor_key=None):
+        """Select strings from a non-empty list according to the selection priorities"""
         if p1_select_by_numbers.strip():
             # Use selected numbers if provided (highest priority)
             selected_input_strings = self.get_selected_strings(input_strings, p1_select_by_numbers)
@@ -149,9 +219,7 @@ class BaseStringList:
             if not input_strings:
                 selected_input_strings = []
             else:
-                selected_input_strings = [input_strings[self.current_index]]
-                # Update index for next selection
-                self.current_index = (self.current_index + 1) % len(input_strings)
+                selected_input_strings = [input_strings[self.next_sequential_index(len(input_strings), cursor_key)]]
         else:
             # Otherwise use random selection (lowest priority)
             if p3_select_random_count == -1:
@@ -164,7 +232,10 @@ class BaseStringList:
                 # Randomly select specified number of strings
                 count = min(p3_select_random_count, len(input_strings))
                 selected_input_strings = random.sample(input_strings, count)
-        
+        return selected_input_strings
+
+    def finalize_selection(self, selected_input_strings, translate_output, string_list=None, translator=None):
+        """Append the optional string_list to the selection and translate if enabled"""
         # Combine with optional string_list if provided
         if string_list is not None:
             string_list = [str(item).strip() for item in string_list if str(item).strip()]
@@ -174,7 +245,7 @@ class BaseStringList:
 
         # Translate strings if enabled
         if translate_output and final_strings:
-            final_strings = self.translate_strings(final_strings)
+            final_strings = self.translate_strings(final_strings, translator)
 
         # Return the same list for both outputs
         return (final_strings, final_strings)
@@ -186,6 +257,9 @@ class StringTranslate(BaseStringList):
             "required": {
                 "translate_output": ("BOOLEAN", {"default": False}),
                 "string": ("STRING", {"multiline": True}),
+            },
+            "optional": {
+                "translator": (translation_utils.available_translators(), {"default": translation_utils.DEFAULT_TRANSLATOR}),
             }
         }
 
@@ -194,10 +268,9 @@ class StringTranslate(BaseStringList):
     FUNCTION = "process_string"
     CATEGORY = "String Helper"
 
-    def process_string(self, string, translate_output):
+    def process_string(self, string, translate_output, translator=None):
         if translate_output:
-            final_strings = self.translate_strings(string)
-            return (final_strings,)
+            return (self.translate_strings([string], translator)[0],)
         return (string,)
 
 class StringList(BaseStringList):
@@ -274,7 +347,8 @@ class StringList(BaseStringList):
                 }),
             },
             "optional": {
-                "string_list": ("LIST",)
+                "string_list": ("LIST",),
+                "translator": (translation_utils.available_translators(), {"default": translation_utils.DEFAULT_TRANSLATOR}),
             }
         }
     
@@ -283,12 +357,21 @@ class StringList(BaseStringList):
     OUTPUT_IS_LIST = (False, True)
     FUNCTION = "process"
     CATEGORY = "String Helper"
-    IS_CHANGED = True
 
-    def process(self, p1_select_by_numbers, p2_select_sequential, p3_select_random_count, translate_output, string1, string2, string3, string4, string5, string6, string7, string8, string9, string10, string_list=None):
+    @classmethod
+    def IS_CHANGED(cls, p1_select_by_numbers, p2_select_sequential, p3_select_random_count, translate_output, **kwargs):
+        # Random and sequential picks change on every run; NaN never compares equal, forcing re-execution
+        if not cls.is_deterministic_selection(p1_select_by_numbers, p2_select_sequential, p3_select_random_count):
+            return float("nan")
+        # Otherwise the output depends only on the inputs, which ComfyUI already tracks
+        return ""
+
+    def process(self, p1_select_by_numbers, p2_select_sequential, p3_select_random_count, translate_output, string1, string2, string3, string4, string5, string6, string7, string8, string9, string10, string_list=None, translator=None):
         # Create a list of all strings from inputs, including empty ones
         input_strings = [string1, string2, string3, string4, string5, string6, string7, string8, string9, string10]
-        return self.process_string_selection(input_strings, p3_select_random_count, p1_select_by_numbers, translate_output, p2_select_sequential, string_list)
+        # Nodes with the same inputs share one sequential cursor
+        cursor_key = cursor_store.make_cursor_key('list', *input_strings) if p2_select_sequential else None
+        return self.process_string_selection(input_strings, p3_select_random_count, p1_select_by_numbers, translate_output, p2_select_sequential, string_list, translator, cursor_key)
 
 
 class StringListFromCSV(BaseStringList):
@@ -332,6 +415,9 @@ class StringListFromCSV(BaseStringList):
             },
             "optional": {
                 "string_list": ("LIST",),
+                "filter_mode": (["any", "all"], {"default": "any"}),
+                "exact_tag_match": ("BOOLEAN", {"default": False}),
+                "translator": (translation_utils.available_translators(), {"default": translation_utils.DEFAULT_TRANSLATOR}),
             }
         }
     
@@ -340,54 +426,181 @@ class StringListFromCSV(BaseStringList):
     OUTPUT_IS_LIST = (False, True)
     FUNCTION = "read_strings_from_csv"
     CATEGORY = "String Helper"
-    IS_CHANGED = True
+
+    @classmethod
+    def IS_CHANGED(cls, csv_file, use_translated, filter_tags, p1_select_by_numbers, p2_select_sequential, p3_select_random_count, translate_output, reuse_last_result, **kwargs):
+        # A reused result stays the same until reuse_last_result is switched off
+        if reuse_last_result:
+            return "reuse_last_result"
+        # Random and sequential picks change on every run; NaN never compares equal, forcing re-execution
+        if not cls.is_deterministic_selection(p1_select_by_numbers, p2_select_sequential, p3_select_random_count):
+            return float("nan")
+        # Deterministic selections only change with the file, fingerprinted by path, mtime and size
+        csv_path = os.path.abspath(cls.get_absolute_path(csv_file))
+        flush_writes(csv_path)
+        try:
+            signature = file_signature(csv_path)
+        except OSError:
+            signature = None
+        return f"{csv_path}|{signature}|{use_translated}|{filter_tags}|{p1_select_by_numbers}|{p3_select_random_count}|{translate_output}"
 
     def __init__(self):
         super().__init__()
         self.last_result = None
 
-    def read_csv_file(self, csv_file, filter_tags="", use_translated=False):
-        """Read strings from CSV file with template format"""
-        csv_path = self.get_absolute_path(csv_file)
-        
-        rows, _ = self.read_csv_with_encoding(csv_path)
-        if rows is None:
-            return []
-            
+    def filter_strings(self, rows, filter_tags="", use_translated=False, filter_mode="any", exact_tag_match=False):
+        """Yield the selected column of rows that are non-empty and match the filter tags"""
         # Parse filter tags
-        filter_tag_list = [tag.strip() for tag in filter_tags.split(',') if tag.strip()]
+        filter_tag_list = parse_filter_tags(filter_tags)
         
         # Read strings based on the use_translated flag and filter by tags
         column = 'zh' if use_translated else 'string'
-        filtered_rows = []
         for row in rows:
-            if not row or not row.get(column, '').strip():
+            if not row or not (row.get(column) or '').strip():
                 continue
                 
-            # If filter tags are specified, check if any tag matches
+            # If filter tags are specified, check the row's tags against them
             if filter_tag_list:
-                row_tags = row.get('tags', '')
-                if not any(tag in row_tags for tag in filter_tag_list):
+                if not match_tags(split_tags(row.get('tags')), filter_tag_list, filter_mode, exact_tag_match):
                     continue
                     
-            filtered_rows.append(row[column].strip())
+            yield row[column].strip()
+
+    def read_csv_file(self, csv_file, filter_tags="", use_translated=False, filter_mode="any", exact_tag_match=False):
+        """Read strings from CSV file with template format, filtering through the cached tag index"""
+        csv_path = self.get_absolute_path(csv_file)
+        
+        parsed = self.load_csv(csv_path)
+        if parsed is None:
+            return []
             
-        return filtered_rows
+        column = 'zh' if use_translated else 'string'
+        return parsed.filter_strings(column, parse_filter_tags(filter_tags), filter_mode, exact_tag_match)
+
+    def iter_csv_strings(self, csv_path, filter_tags="", use_translated=False, filter_mode="any", exact_tag_match=False):
+        """Stream filtered strings from a CSV file one row at a time"""
+        rows = iter_csv_rows(csv_path, self.get_encoding(csv_path))
+        stats.incr('csv.stream_scans')
+        return self.filter_strings(rows, filter_tags, use_translated, filter_mode, exact_tag_match)
+
+    def sequential_cursor_key(self, csv_path, filter_tags="", use_translated=False, filter_mode="any", exact_tag_match=False):
+        """Key of the shared sequential cursor: one cursor per CSV file, column and tag filter"""
+        filter_tag_list = parse_filter_tags(filter_tags)
+        column = 'zh' if use_translated else 'string'
+        if not filter_tag_list:
+            return cursor_store.make_cursor_key('csv', os.path.abspath(csv_path), column)
+        return cursor_store.make_cursor_key('csv', os.path.abspath(csv_path), column, filter_mode, exact_tag_match, *filter_tag_list)
+
+    def indexed_string_selection(self, csv_path, use_translated, p1_select_by_numbers, p2_select_sequential, cursor_key=None):
+        """Pick numbered or sequential strings by seeking straight to their rows through the row-offset index
+
+        Returns None if the file cannot be indexed, otherwise (available_count, selected_strings).
+        """
+        encoding = self.get_encoding(csv_path)
+        row_index = get_row_index(csv_path)
+        column = 'zh' if use_translated else 'string'
+        with row_index.lock:
+            if not row_index.sync(encoding):
+                return None
+            count = row_index.count(column)
+            if count == 0:
+                return (0, [])
+
+            if p1_select_by_numbers.strip():
+                try:
+                    numbers = [int(i.strip()) - 1 for i in p1_select_by_numbers.split(',') if i.strip()]
+                except ValueError:
+                    print("Invalid number format. Please use comma-separated numbers (e.g., '1,3,5')")
+                    return (count, [])
+                positions = [i for i in numbers if 0 <= i < count]
+            else:
+                positions = [self.next_sequential_index(count, cursor_key)]
+
+            stats.incr('csv.indexed_selections')
+            return (count, row_index.read_strings(column, positions, encoding))
 
-    def read_strings_from_csv(self, csv_file, use_translated, filter_tags, p1_select_by_numbers, p2_select_sequential, p3_select_random_count, translate_output, reuse_last_result, string_list=None):
+    def stream_string_selection(self, csv_path, filter_tags, use_translated, p3_select_random_count, p1_select_by_numbers, p2_select_sequential, filter_mode="any", exact_tag_match=False, cursor_key=None):
+        """Select strings from a CSV file in bounded memory without materializing all rows
+
+        Returns None if no rows match, mirroring the empty-input case of process_string_selection.
+        """
+        filter_args = (filter_tags, use_translated, filter_mode, exact_tag_match)
+        strings = self.iter_csv_strings(csv_path, *filter_args)
+        first = next(strings, None)
+        if first is None:
+            return None
+        strings = itertools.chain([first], strings)
+
+        if p1_select_by_numbers.strip():
+            try:
+                numbers = [int(i.strip()) - 1 for i in p1_select_by_numbers.split(',') if i.strip()]
+            except ValueError:
+                print("Invalid number format. Please use comma-separated numbers (e.g., '1,3,5')")
+                return []
+            return select_by_indices(strings, numbers)
+        elif p2_select_sequential:
+            # Wrap around lazily: the row count is only known once the stream runs out
+            index = self.next_sequential_index(None, cursor_key)
+            selected = select_by_indices(strings, [index])
+            if not selected:
+                count = sum(1 for _ in self.iter_csv_strings(csv_path, *filter_args))
+                index = self.wrap_sequential_index(index, count, cursor_key)
+                selected = select_by_indices(self.iter_csv_strings(csv_path, *filter_args), [index])
+            return selected
+        elif p3_select_random_count == -1:
+            return list(strings)
+        elif p3_select_random_count == 0:
+            return []
+        else:
+            return reservoir_sample(strings, p3_select_random_count)
+
+    def read_strings_from_csv(self, csv_file, use_translated, filter_tags, p1_select_by_numbers, p2_select_sequential, p3_select_random_count, translate_output, reuse_last_result, string_list=None, filter_mode="any", exact_tag_match=False, translator=None):
         # If reusing last result and it exists, return it directly
         if reuse_last_result and self.last_result is not None:
             return self.last_result
 
+        csv_path = self.get_absolute_path(csv_file)
+        # Rows queued by StringListToCSV/JsonToCSV earlier in the workflow must be on disk first
+        flush_writes(csv_path)
+        cursor_key = None
+        if p2_select_sequential and not p1_select_by_numbers.strip():
+            cursor_key = self.sequential_cursor_key(csv_path, filter_tags, use_translated, filter_mode, exact_tag_match)
+
+        # Numbered and sequential picks without tag filters read only the selected rows of large files
+        if (p1_select_by_numbers.strip() or p2_select_sequential) and not parse_filter_tags(filter_tags) and should_index(csv_path):
+            try:
+                indexed = self.indexed_string_selection(csv_path, use_translated, p1_select_by_numbers, p2_select_sequential, cursor_key)
+            except Exception as e:
+                print(f"Error reading CSV row index: {str(e)}")
+                indexed = None
+            if indexed is not None:
+                count, selected = indexed
+                result = ([], []) if count == 0 else self.finalize_selection(selected, translate_output, string_list, translator)
+                self.last_result = result
+                return result
+
+        # Stream files too large to cache instead of loading every row into memory
+        if should_stream(csv_path):
+            try:
+                selected = self.stream_string_selection(csv_path, filter_tags, use_translated, p3_select_random_count, p1_select_by_numbers, p2_select_sequential, filter_mode, exact_tag_match, cursor_key)
+            except Exception as e:
+                print(f"Error reading CSV file: {str(e)}")
+                selected = None
+            result = ([], []) if selected is None else self.finalize_selection(selected, translate_output, string_list, translator)
+            self.last_result = result
+            return result
+
         # Read and process strings
-        input_strings = self.read_csv_file(csv_file, filter_tags, use_translated)
+        input_strings = self.read_csv_file(csv_file, filter_tags, use_translated, filter_mode, exact_tag_match)
         result = self.process_string_selection(
             input_strings, 
             p3_select_random_count, 
             p1_select_by_numbers, 
             translate_output,
             p2_select_sequential,
-            string_list
+            string_list,
+            translator,
+            cursor_key
         )
         
         # Save result for future reuse
@@ -419,6 +632,7 @@ class StringListToCSV(BaseStringList):
             "optional": {
                 "string": ("STRING", {"forceInput": True}),
                 "string_list": ("LIST", {"forceInput": True}),
+                "translator": (translation_utils.available_translators(), {"default": translation_utils.DEFAULT_TRANSLATOR}),
             }
         }
     
@@ -428,7 +642,7 @@ class StringListToCSV(BaseStringList):
     FUNCTION = "write_to_csv"
     CATEGORY = "String Helper"
 
-    def write_to_csv(self, csv_file, tags, translate, append_mode, string=None, string_list=None):
+    def write_to_csv(self, csv_file, tags, translate, append_mode, string=None, string_list=None, translator=None):
         """Write string list to CSV file with optional translation"""
         # Initialize processed_strings and skipped_strings
         processed_strings = []
@@ -450,10 +664,19 @@ class StringListToCSV(BaseStringList):
         if len(string_list) == 0 or not string_list:
             return processed_strings, skipped_strings
 
+        # Translate all strings concurrently in one call
+        zh_texts = [''] * len(string_list)
+        if translate:
+            # Failed translations leave the zh column empty instead of writing an error message into the CSV
+            for i, result in enumerate(translation_utils.translate_texts_detailed(string_list, 'zh', translator)):
+                if isinstance(result, translation_utils.TranslationError):
+                    print(f"Translation error: {str(result)}")
+                    result = ''
+                zh_texts[i] = result
+
         # Prepare rows for CSV
         rows_to_write = []
-        for string_value in string_list:
-            zh_text = translate_texts([string_value], 'zh')[0] if translate else ''
+        for string_value, zh_text in zip(string_list, zh_texts):
             rows_to_write.append({
                 'string': string_value,
                 'zh': zh_text,
@@ -1,7 +1,92 @@
 from .lib import ANY
+from ..stats import stats
+import functools
 import json
 import re
 
+# Characters that make a condition a regular expression rather than a literal
+REGEX_METACHARACTERS = frozenset('.^$*+?{}[]\\|()')
+# Constructs that change meaning or fail when patterns are merged into one alternation:
+# backreferences, named groups, inline flags and conditional group references
+UNMERGEABLE_PATTERN = re.compile(r'\\\d|\(\?P[<=]|\(\?[aiLmsux]|\(\?\(')
+
+
+class ConditionTable:
+    """
+    A condition list parsed once into a rule table.
+    Literal conditions are looked up in a dict; regex conditions are merged into a single
+    alternation of named groups, so one scan finds the first matching regex rule.
+    Rules keep their original priority: the first matching line wins.
+    """
+
+    def __init__(self, condition_list):
+        self.literals = {}
+        self.values = []
+        regex_rules = []
+
+        conditions = [line.strip() for line in condition_list.split('\n') if line.strip()]
+        for condition in conditions:
+            if ':' not in condition:
+                continue
+
+            cond, val = condition.split(':', 1)
+            cond = cond.strip()
+            index = len(self.values)
+            self.values.append(val.strip())
+
+            if REGEX_METACHARACTERS.isdisjoint(cond):
+                self.literals.setdefault(cond, index)
+                continue
+            try:
+                regex_rules.append((index, cond, re.compile(f"^{cond}$")))
+            except re.error:
+                # If regex is invalid, fall back to exact match
+                self.literals.setdefault(cond, index)
+
+        self.merged = None
+        self.group_rules = {}
+        self.regex_rules = [(index, pattern) for index, _, pattern in regex_rules]
+        if regex_rules and not any(UNMERGEABLE_PATTERN.search(cond) for _, cond, _ in regex_rules):
+            try:
+                self.merged = re.compile('|'.join(f"(?P<r{index}>^{cond}$)" for index, cond, _ in regex_rules))
+                self.group_rules = {self.merged.groupindex[f"r{index}"]: index for index, _, _ in regex_rules}
+            except re.error:
+                self.merged = None
+
+    def match_index(self, match_str):
+        """Return the index of the first rule matching match_str, or None"""
+        # '$' also matches before a trailing newline, so mirror that for literals
+        index = self.literals.get(match_str)
+        if index is None and match_str.endswith('\n'):
+            index = self.literals.get(match_str[:-1])
+
+        if self.merged is not None:
+            m = self.merged.match(match_str)
+            if m is not None:
+                regex_index = self.group_rules[m.lastindex]
+                if index is None or regex_index < index:
+                    index = regex_index
+            return index
+
+        for regex_index, pattern in self.regex_rules:
+            if index is not None and regex_index > index:
+                break
+            if pattern.match(match_str):
+                return regex_index
+        return index
+
+    def match(self, match_str, default_value=""):
+        """Return the value of the first rule matching match_str, or default_value"""
+        index = self.match_index(match_str)
+        return default_value if index is None else self.values[index]
+
+
+@functools.lru_cache(maxsize=128)
+def compile_conditions(condition_list):
+    """Parse a condition list into a ConditionTable, cached by the condition text"""
+    return ConditionTable(condition_list)
+
+
 class StringMatcher:
     """
     A node that matches a string against a list of conditions and returns the matched value.
@@ -25,6 +110,7 @@ class StringMatcher:
             "optional": {
                 "match_value": (ANY, {"default": None}),
                 "default_value": ("STRING", {"default": ""}),
+                "batch_mode": ("BOOLEAN", {"default": False}),
             }
         }
     
@@ -33,52 +119,50 @@ class StringMatcher:
     FUNCTION = "match_string"
     CATEGORY = "String Helper"
     
-    def match_string(self, condition_list, target_type, match_value=None, default_value=""):
+    @stats.timed('matcher.match')
+    def match_string(self, condition_list, target_type, match_value=None, default_value="", batch_mode=False):
+        table = compile_conditions(condition_list)
+
+        # Batch mode: classify every element of a list against the same compiled rules
+        if batch_mode and isinstance(match_value, (list, tuple)):
+            stats.incr('matcher.batch_values', len(match_value))
+            matched = {}
+            values = []
+            for item in match_value:
+                if item is None:
+                    value = default_value
+                else:
+                    match_str = str(item)
+                    if match_str not in matched:
+                        matched[match_str] = table.match(match_str, default_value)
+                    value = matched[match_str]
+                values.append(self.convert_value(value, target_type))
+            return (values,)
+
         if match_value is None:
             value = default_value
         else:
-            match_str = str(match_value)
-            conditions = [line.strip() for line in condition_list.split('\n') if line.strip()]
-            
-            value = default_value
-            for condition in conditions:
-                if ':' not in condition:
-                    continue
-                    
-                cond, val = condition.split(':', 1)
-                cond = cond.strip()
-                val = val.strip()
-                
-                try:
-                    if re.match(f"^{cond}$", match_str):
-                        value = val
-                        break
-                except re.error:
-                    # If regex is invalid, try exact match
-                    if cond == match_str:
-                        value = val
-                        break
+            value = table.match(str(match_value), default_value)
+
+        return (self.convert_value(value, target_type),)
 
+    def convert_value(self, value, target_type):
+        """Convert a matched string value to the target type"""
         try:
             if target_type == "STRING" or not value.strip():
-                return (value,)
+                return value
             elif target_type == "INT":
-                value = int(float(value))
-                return (value,)
+                return int(float(value))
             elif target_type == "FLOAT":
-                value = float(value)
-                return (value,)
+                return float(value)
             elif target_type == "BOOL":
-                value = value.lower() in ('true', '1', 'yes', 'y', 'on')
-                return (value,)
+                return value.lower() in ('true', '1', 'yes', 'y', 'on')
             elif target_type == "LIST":
                 if not value.strip():
-                    return ([],)
-                value = [item.strip() for item in value.split(",")]
-                return (value,)
+                    return []
+                return [item.strip() for item in value.split(",")]
             elif target_type == "DICT":
-                value = json.loads(value)
-                return (value,)
+                return json.loads(value)
             else:
                 raise ValueError(f"Unsupported type: {target_type}")
         except Exception as e:
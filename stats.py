@@ -0,0 +1,161 @@
+import atexit
+import bisect
+import functools
+import json
+import os
+import threading
+import time
+
+# 设置该环境变量为 1/true/yes/on 即开启统计
+STATS_ENABLED = os.environ.get('STRING_HELPER_STATS', '').lower() in ('1', 'true', 'yes', 'on')
+# 设置后在进程退出时将统计摘要以JSON写入该文件（同时开启统计）
+STATS_FILE = os.environ.get('STRING_HELPER_STATS_FILE')
+# 耗时直方图的桶上界（秒），最后一个桶收录更慢的调用
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Timing:
+    """单个计时项的调用次数、总耗时、最大耗时及耗时直方图"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def summary(self):
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'avg_ms': round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'histogram': {label: n for label, n in zip(labels, self.buckets) if n},
+        }
+
+
+class _Timer:
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stats.observe(self.name, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.stats.incr(self.name + '.errors')
+        return False
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Stats:
+    """
+    进程级计数器与计时器。未开启时incr直接返回、timer返回共享的空上下文管理器，开销可忽略。
+    计时块内抛出异常时额外累加“<名称>.errors”计数。
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.time()
+        self._counters = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        """开启或关闭统计（已记录的数据保留）"""
+        self.enabled = enabled
+
+    def incr(self, name, value=1):
+        """累加计数器"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, seconds):
+        """记录一次耗时（秒）"""
+        if not self.enabled:
+            return
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = Timing()
+            timing.add(seconds)
+
+    def timer(self, name):
+        """返回计时上下文管理器：with stats.timer('csv.parse'): ..."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name):
+        """装饰器：为函数的每次调用计时，未开启统计时直接调用原函数"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def reset(self):
+        """清空已记录的数据"""
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+            self.started = time.time()
+
+    def summary(self):
+        """返回统计摘要字典"""
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'uptime_s': round(time.time() - self.started, 3),
+                'counters': dict(sorted(self._counters.items())),
+                'timings': {name: timing.summary() for name, timing in sorted(self._timings.items())},
+            }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.summary(), ensure_ascii=False, indent=indent)
+
+    def dump(self, path):
+        """将统计摘要写入JSON文件"""
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(self.to_json())
+        except Exception as e:
+            print(f"Error writing stats: {str(e)}")
+
+
+# 全局统计
+stats = Stats(enabled=STATS_ENABLED or bool(STATS_FILE))
+
+if STATS_FILE:
+    atexit.register(stats.dump, STATS_FILE)
@@ -0,0 +1,302 @@
+import ast
+import functools
+import re
+import types
+
+# 已解析模板的缓存数量
+TEMPLATE_CACHE_SIZE = 256
+# 格式说明中允许的最大宽度/精度，避免生成超大字符串
+MAX_FORMAT_WIDTH = 10000
+# 单个过滤器结果和整个模板渲染结果的最大长度（字符），防止 replace/join 等过滤器反复放大字符串
+MAX_OUTPUT_LENGTH = 1000000
+# 允许在模板中引用的变量名
+VARIABLE_PATTERN = re.compile(r'^arg([1-9]|10)$')
+# 访问结果禁止为以下类型，防止通过属性链读取解释器内部状态
+FORBIDDEN_TYPES = (types.ModuleType, types.FrameType, types.CodeType, types.TracebackType)
+
+_TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+      | (?P<number>-?\d+(?:\.\d+)?)
+      | (?P<string>'(?:[^'\\]|\\.)*'|"(?:[^"\\]|\\.)*")
+      | (?P<op>[.\[\]|(),])
+    )''', re.VERBOSE)
+
+
+class TemplateError(ValueError):
+    """模板语法错误或访问了不允许的内容"""
+
+
+def _truncate(value, length=50, end='...'):
+    value = str(value)
+    return value if len(value) <= length else value[:length] + end
+
+
+def _default(value, default=''):
+    return default if value is None or value == '' else value
+
+
+def _check_length(length):
+    if length > MAX_OUTPUT_LENGTH:
+        raise TemplateError(f"Output length {length} exceeds the limit of {MAX_OUTPUT_LENGTH}")
+
+
+def _join(value, sep=', '):
+    items = [str(item) for item in value]
+    sep = str(sep)
+    _check_length(sum(map(len, items)) + len(sep) * max(len(items) - 1, 0))
+    return sep.join(items)
+
+
+def _replace(value, old, new):
+    value, old, new = str(value), str(old), str(new)
+    # 先按替换次数估算结果长度，超出限制时不生成结果
+    _check_length(len(value) + value.count(old) * (len(new) - len(old)))
+    return value.replace(old, new)
+
+
+# 白名单过滤器：{arg1|upper}、{arg2|join(", ")}、{arg1|truncate(20)}
+FILTERS = {
+    'upper': lambda value: str(value).upper(),
+    'lower': lambda value: str(value).lower(),
+    'title': lambda value: str(value).title(),
+    'capitalize': lambda value: str(value).capitalize(),
+    'strip': lambda value: str(value).strip(),
+    'join': _join,
+    'truncate': _truncate,
+    'default': _default,
+    'replace': _replace,
+    'first': lambda value: value[0],
+    'last': lambda value: value[-1],
+    'length': len,
+}
+
+CONVERSIONS = {'r': repr, 's': str, 'a': ascii}
+
+
+class Field:
+    """
+    模板中的一个替换字段：变量、属性/下标访问链、过滤器、转换和格式说明。
+    """
+
+    def __init__(self, name, accessors, filters, conversion, format_spec):
+        self.name = name
+        self.accessors = accessors
+        self.filters = filters
+        self.conversion = conversion
+        self.format_spec = format_spec
+
+    def render(self, args):
+        value = args.get(self.name)
+        for kind, key in self.accessors:
+            if kind == 'attr':
+                value = value[key] if isinstance(value, dict) else getattr(value, key)
+            else:
+                value = value[key]
+            if isinstance(value, FORBIDDEN_TYPES):
+                raise TemplateError(f"Access to {type(value).__name__} objects is not allowed")
+        for func, func_args in self.filters:
+            value = func(value, *func_args)
+            if isinstance(value, str):
+                _check_length(len(value))
+        if self.conversion:
+            value = CONVERSIONS[self.conversion](value)
+        return format(value, self.format_spec)
+
+
+class Template:
+    """已解析的模板，由文本片段和替换字段组成，可用不同参数重复渲染"""
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def render(self, args):
+        rendered = []
+        length = 0
+        for part in self.parts:
+            text = part if isinstance(part, str) else part.render(args)
+            length += len(text)
+            _check_length(length)
+            rendered.append(text)
+        return ''.join(rendered)
+
+
+def _find_field_end(template, start):
+    """返回替换字段结束的 '}' 位置（跳过引号内的内容），找不到时返回-1"""
+    quote = None
+    i = start
+    while i < len(template):
+        char = template[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char == '{':
+            raise TemplateError("Nested '{' is not allowed in a replacement field")
+        elif char == '}':
+            return i
+        i += 1
+    return -1
+
+
+def _split_outside_quotes(text, separator):
+    """在引号和方括号之外查找第一个separator，返回(前半部分, 后半部分或None)"""
+    quote = None
+    depth = 0
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char in '[(':
+            depth += 1
+        elif char in '])':
+            depth -= 1
+        elif char == separator and depth == 0:
+            return text[:i], text[i + 1:]
+        i += 1
+    return text, None
+
+
+def _tokenize(text):
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN_PATTERN.match(text, position)
+        if not match or match.end() == position:
+            raise TemplateError(f"Invalid syntax in field: {text!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _literal(kind, value):
+    if kind in ('number', 'string'):
+        return ast.literal_eval(value)
+    raise TemplateError(f"Expected a literal, got {value!r}")
+
+
+def _check_format_spec(format_spec):
+    for number in re.findall(r'\d+', format_spec):
+        if int(number) > MAX_FORMAT_WIDTH:
+            raise TemplateError(f"Format width {number} exceeds the limit of {MAX_FORMAT_WIDTH}")
+
+
+def _parse_field(text):
+    """解析替换字段：expr ('|' filter)* ('!' conversion)? (':' format_spec)?"""
+    text, format_spec = _split_outside_quotes(text, ':')
+    format_spec = format_spec or ''
+    _check_format_spec(format_spec)
+
+    text, conversion = _split_outside_quotes(text, '!')
+    if conversion is not None:
+        conversion = conversion.strip()
+        if conversion not in CONVERSIONS:
+            raise TemplateError(f"Invalid conversion '!{conversion}'")
+
+    tokens = _tokenize(text)
+    if not tokens or tokens[0][0] != 'name':
+        raise TemplateError(f"Expected a variable name in field: {text!r}")
+    name = tokens[0][1]
+    if not VARIABLE_PATTERN.match(name):
+        raise TemplateError(f"Unknown variable '{name}', only arg1 - arg10 are available")
+
+    accessors = []
+    filters = []
+    i = 1
+
+    def expect(op):
+        nonlocal i
+        if i >= len(tokens) or tokens[i] != ('op', op):
+            raise TemplateError(f"Expected '{op}' in field: {text!r}")
+        i += 1
+
+    # 属性与下标访问
+    while i < len(tokens) and tokens[i] in (('op', '.'), ('op', '[')):
+        op = tokens[i][1]
+        i += 1
+        if i >= len(tokens):
+            raise TemplateError(f"Unexpected end of field: {text!r}")
+        kind, value = tokens[i]
+        i += 1
+        if op == '.':
+            if kind != 'name' or value.startswith('_'):
+                raise TemplateError(f"Invalid attribute '{value}'")
+            accessors.append(('attr', value))
+        else:
+            key = _literal(kind, value)
+            if isinstance(key, float):
+                raise TemplateError(f"Invalid index {value}")
+            accessors.append(('item', key))
+            expect(']')
+
+    # 过滤器
+    while i < len(tokens) and tokens[i] == ('op', '|'):
+        i += 1
+        if i >= len(tokens) or tokens[i][0] != 'name' or tokens[i][1] not in FILTERS:
+            raise TemplateError(f"Unknown filter in field: {text!r}. Available: {', '.join(FILTERS)}")
+        func = FILTERS[tokens[i][1]]
+        i += 1
+        func_args = []
+        if i < len(tokens) and tokens[i] == ('op', '('):
+            i += 1
+            while i < len(tokens) and tokens[i] != ('op', ')'):
+                func_args.append(_literal(*tokens[i]))
+                i += 1
+                if i < len(tokens) and tokens[i] == ('op', ','):
+                    i += 1
+            expect(')')
+        filters.append((func, tuple(func_args)))
+
+    if i != len(tokens):
+        raise TemplateError(f"Unexpected '{tokens[i][1]}' in field: {text!r}")
+
+    return Field(name, tuple(accessors), tuple(filters), conversion, format_spec)
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def parse_template(template):
+    """
+    将模板解析为Template（按模板文本缓存）。
+    支持 {argN}、属性/下标访问、!r/!s/!a 转换、格式说明以及白名单过滤器，不执行任意Python代码。
+    """
+    parts = []
+    literal = []
+    i = 0
+    while i < len(template):
+        char = template[i]
+        if char == '{':
+            if template.startswith('{{', i):
+                literal.append('{')
+                i += 2
+                continue
+            end = _find_field_end(template, i + 1)
+            if end == -1:
+                raise TemplateError("Unmatched '{' in template")
+            if literal:
+                parts.append(''.join(literal))
+                literal = []
+            parts.append(_parse_field(template[i + 1:end]))
+            i = end + 1
+        elif char == '}':
+            if template.startswith('}}', i):
+                literal.append('}')
+                i += 2
+                continue
+            raise TemplateError("Single '}' is not allowed in template")
+        else:
+            literal.append(char)
+            i += 1
+    if literal:
+        parts.append(''.join(literal))
+    return Template(parts)
@@ -0,0 +1,14 @@
+"""Load the node pack as the ``string_helper`` package, the way ComfyUI imports it."""
+import importlib.util
+import os
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if 'string_helper' not in sys.modules:
+    spec = importlib.util.spec_from_file_location(
+        'string_helper', os.path.join(REPO_ROOT, '__init__.py'), submodule_search_locations=[REPO_ROOT]
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules['string_helper'] = module
+    spec.loader.exec_module(module)
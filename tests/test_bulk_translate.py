@@ -0,0 +1,122 @@
+import os
+
+import pytest
+
+from string_helper import bulk_translate
+from string_helper.bulk_translate import BulkTranslateJob
+from string_helper.nodes.bulk_translate_csv import BulkTranslateCSV
+
+
+def make_job(path, translate=None, **kwargs):
+    job = BulkTranslateJob(str(path), 'string', 'zh', 'zh', 'local', progress=None, **kwargs)
+    job._translate_chunk = translate or (lambda texts: [text.upper() for text in texts])
+    return job
+
+
+def test_nothing_to_translate_leaves_file_untouched(tmp_path):
+    path = tmp_path / 'library.csv'
+    path.write_bytes(b'string,zh\na girl,\xe5\xa5\xb3\xe5\xad\xa9\n\n')
+    os.utime(path, (1000000000, 1000000000))
+    before = os.stat(path)
+
+    summary = make_job(path).run()
+
+    after = os.stat(path)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+    assert summary['completed'] and summary['rows'] == 1
+    assert not os.path.exists(str(path) + bulk_translate.PARTIAL_SUFFIX)
+
+
+def test_untranslated_rows_keep_original_bytes(tmp_path):
+    path = tmp_path / 'library.csv'
+    path.write_bytes(b'string,zh\n"a\r\nb",done\na cat,\n\nsolo\n"x"y,\n')
+
+    summary = make_job(path, chunk_size=1).run()
+
+    assert summary['completed'] and summary['translated'] == 3
+    assert path.read_bytes() == b'string,zh\n"a\r\nb",done\na cat,A CAT\n\nsolo,SOLO\nxy,XY\n'
+
+
+def test_new_target_column_uses_source_line_endings(tmp_path):
+    path = tmp_path / 'library.csv'
+    path.write_bytes(b'string\r\na dog\r\n')
+
+    make_job(path).run()
+
+    assert path.read_bytes() == b'string,zh\r\na dog,A DOG\r\n'
+
+
+def test_rows_appended_during_the_job_are_translated(tmp_path):
+    path = tmp_path / 'library.csv'
+    path.write_bytes(b'string,zh\na,\nb,\n')
+
+    def translate(texts):
+        # Append only after the reader has reached the end of the file
+        if texts == ['b']:
+            with open(path, 'ab') as f:
+                f.write(b'c,\n')
+        return [text.upper() for text in texts]
+
+    summary = make_job(path, translate, chunk_size=1).run()
+
+    assert summary['completed'] and summary['rows'] == 3
+    assert path.read_bytes() == b'string,zh\na,A\nb,B\nc,C\n'
+
+
+@pytest.mark.parametrize('rewrite', [b'string,zh\na,\n', b'string,zh\nz,\nb,\n'])
+def test_rewritten_source_aborts_and_drops_checkpoint(tmp_path, rewrite):
+    path = tmp_path / 'library.csv'
+    path.write_bytes(b'string,zh\na,\nb,\n')
+
+    def translate(texts):
+        path.write_bytes(rewrite)
+        return [text.upper() for text in texts]
+
+    with pytest.raises(RuntimeError):
+        make_job(path, translate, chunk_size=1).run()
+
+    assert path.read_bytes() == rewrite
+    assert not os.path.exists(str(path) + bulk_translate.PARTIAL_SUFFIX)
+    assert not os.path.exists(str(path) + bulk_translate.PROGRESS_SUFFIX)
+
+
+def test_resume_after_stop_matches_uninterrupted_run(tmp_path):
+    data = b'string,zh\n' + b''.join(b'row %d,\n' % i for i in range(7)) + b'\nlast,\n'
+    expected_path = tmp_path / 'expected.csv'
+    expected_path.write_bytes(data)
+    make_job(expected_path, chunk_size=2).run()
+
+    path = tmp_path / 'library.csv'
+    path.write_bytes(data)
+    stop = bulk_translate.translation_utils.TranslationError('local', 'circuit_open', 'open')
+    calls = []
+
+    def translate(texts):
+        calls.append(texts)
+        return [stop] * len(texts) if len(calls) > 2 else [text.upper() for text in texts]
+
+    summary = make_job(path, translate, chunk_size=2).run()
+    assert not summary['completed'] and summary['rows_done'] == 4
+
+    summary = make_job(path, chunk_size=2).run()
+    assert summary['completed'] and summary['resumed_from'] == 4
+    assert path.read_bytes() == expected_path.read_bytes()
+
+
+def test_node_reruns_while_a_stopped_job_can_resume(tmp_path):
+    path = tmp_path / 'library.csv'
+    path.write_bytes(b'string,zh\na,\nb,\n')
+    stop = bulk_translate.translation_utils.TranslationError('local', 'circuit_open', 'open')
+    calls = []
+
+    def translate(texts):
+        calls.append(texts)
+        return [stop] * len(texts) if len(calls) > 1 else [text.upper() for text in texts]
+
+    unchanged = BulkTranslateCSV.IS_CHANGED(str(path))
+    assert unchanged == BulkTranslateCSV.IS_CHANGED(str(path))
+    make_job(path, translate, chunk_size=1).run()
+    assert BulkTranslateCSV.IS_CHANGED(str(path)) != BulkTranslateCSV.IS_CHANGED(str(path))
+
+    make_job(path).run()
+    assert BulkTranslateCSV.IS_CHANGED(str(path)) == BulkTranslateCSV.IS_CHANGED(str(path))
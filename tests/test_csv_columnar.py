@@ -0,0 +1,33 @@
+from string_helper.csv_columnar import COLUMNAR_SUFFIX, load_columnar, write_columnar
+from string_helper.csv_index import csv_state
+
+
+def write_library(path, strings):
+    path.write_text('string,zh\n' + ''.join(f'{string},\n' for string in strings), encoding='utf-8')
+    rows = [{'string': string, 'zh': ''} for string in strings]
+    assert write_columnar(str(path), csv_state(str(path)), rows, 'utf-8')
+
+
+def test_columns_decode_from_the_sidecar_checked_at_load(tmp_path):
+    path = tmp_path / 'library.csv'
+    write_library(path, ['a girl', 'a dog', 'sep\x1finside'])
+    parsed = load_columnar(str(path))
+    assert parsed.load_column('zh') == ['', '', '']
+
+    # Another process rewrites the CSV and its sidecar before the column is first used
+    write_library(path, ['x' * 50, 'y', 'z'])
+
+    assert parsed.load_column('string') == ['a girl', 'a dog', 'sep\x1finside']
+    assert parsed.rows[1] == {'string': 'a dog', 'zh': ''}
+    assert load_columnar(str(path)).load_column('string') == ['x' * 50, 'y', 'z']
+
+
+def test_stale_or_truncated_sidecar_is_ignored(tmp_path):
+    path = tmp_path / 'library.csv'
+    write_library(path, ['a girl'])
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('a dog,\n')
+    assert load_columnar(str(path)) is None
+
+    (tmp_path / ('library.csv' + COLUMNAR_SUFFIX)).write_bytes(b'SHC1')
+    assert load_columnar(str(path)) is None
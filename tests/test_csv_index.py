@@ -0,0 +1,56 @@
+import csv
+import io
+
+import pytest
+
+from string_helper.csv_index import RowIndex, scan_record_offsets
+
+
+def records(data, offsets):
+    return [data[start:end] for start, end in zip(offsets, offsets[1:])]
+
+
+@pytest.mark.parametrize('newline', [b'\n', b'\r\n'])
+def test_scan_record_offsets_quoted_multiline_and_blank_lines(newline):
+    lines = [b'string,zh', b'"a girl,', b'smiling",\xe5\xa5\xb3', b'', b'"say ""hi""', b'', b'twice",x', b'', b'', b'last,y']
+    data = newline.join(lines) + newline
+
+    offsets = scan_record_offsets(data)
+
+    assert records(data, offsets) == [
+        b'string,zh' + newline,
+        b'"a girl,' + newline + b'smiling",\xe5\xa5\xb3' + newline + newline,
+        b'"say ""hi""' + newline + newline + b'twice",x' + newline + newline + newline,
+        b'last,y' + newline,
+    ]
+    # Agrees with the csv module on the number of non-blank records
+    text = data.decode('utf-8')
+    assert len(offsets) - 1 == len([row for row in csv.reader(io.StringIO(text, newline='')) if row])
+
+
+def test_scan_record_offsets_without_trailing_newline():
+    data = b'string\n\na\n"b\nc"'
+    offsets = scan_record_offsets(data)
+    assert records(data, offsets) == [b'string\n\n', b'a\n', b'"b\nc"']
+
+
+def test_row_index_locate_skips_holes(tmp_path):
+    path = tmp_path / 'library.csv'
+    values = ['', 'a', '', '', 'b', ' ', 'c', '']
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['string', 'zh'])
+        for i, value in enumerate(values):
+            writer.writerow([f'row {i}', value])
+            if i == 2:
+                f.write('\n')
+
+    index = RowIndex(str(path))
+    assert index.sync('utf-8')
+
+    assert index.count('zh') == 3
+    assert index.count('string') == len(values)
+    assert [index.locate('zh', position) for position in range(3)] == [1, 4, 6]
+    assert [index.locate('string', position) for position in range(3)] == [0, 1, 2]
+    assert index.read_strings('zh', [2, 0, 1], 'utf-8') == ['c', 'a', 'b']
+    assert index.read_strings('string', [7, 3], 'utf-8') == ['row 7', 'row 3']
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from string_helper import csv_index, csv_utils
+from string_helper.csv_utils import reservoir_sample, select_by_indices
+from string_helper.nodes.string_list import StringListFromCSV
+
+CSV_BYTES = (
+    b'string,zh,tags\r\n'
+    b'"first line\r\nsecond line",,multi\r\n'
+    b'a girl,,\r\n'
+    b'\r\n'
+    b'"a ""quoted"" dog",,\r\n'
+    + b''.join(b'row %d,,\r\n' % i for i in range(20))
+)
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'library.csv'
+    path.write_bytes(CSV_BYTES)
+    return str(path)
+
+
+def read(csv_path, numbers='', count=-1):
+    node = StringListFromCSV()
+    return node.read_strings_from_csv(csv_path, False, '', numbers, False, count, False, False)[0]
+
+
+@pytest.fixture(params=['cached', 'streamed', 'indexed'])
+def read_path(request, monkeypatch):
+    """Force one of the three read paths regardless of the file size"""
+    if request.param == 'streamed':
+        monkeypatch.setattr(csv_utils, 'STREAMING_THRESHOLD_BYTES', 0)
+    if request.param == 'indexed':
+        monkeypatch.setattr(csv_index, 'ROW_INDEX_MIN_BYTES', 0)
+    return request.param
+
+
+def test_read_paths_return_the_same_strings(csv_path, read_path):
+    expected = ['first line\nsecond line', 'a girl', 'a "quoted" dog'] + [f'row {i}' for i in range(20)]
+    assert read(csv_path) == expected
+    assert read(csv_path, '1, 3, 23, 99, 2') == [expected[0], expected[2], expected[22], expected[1]]
+
+
+def test_streamed_random_pick_draws_from_the_same_strings(csv_path, monkeypatch):
+    everything = read(csv_path)
+    monkeypatch.setattr(csv_utils, 'STREAMING_THRESHOLD_BYTES', 0)
+    picked = read(csv_path, count=5)
+    assert len(picked) == len(set(picked)) == 5
+    assert set(picked) <= set(everything)
+
+
+def test_select_by_indices_keeps_order_and_stops_early():
+    def items():
+        yield from range(10)
+        raise AssertionError('read past the last wanted index')
+
+    assert select_by_indices(items(), [7, 2, -1, 7]) == [7, 2, 7]
+    assert select_by_indices(range(3), [5, 1]) == [1]
+    assert select_by_indices(range(3), []) == []
+
+
+def test_reservoir_sample_matches_in_memory_sampling():
+    assert sorted(reservoir_sample(iter(range(5)), 10, random.Random(1))) == list(range(5))
+    sample = reservoir_sample(iter(range(100)), 10, random.Random(1))
+    assert len(sample) == len(set(sample)) == 10
+
+    # Every item is picked about k/n of the time, like random.sample over a list
+    rng = random.Random(7)
+    counts = [0] * 10
+    for _ in range(5000):
+        for item in reservoir_sample(iter(range(10)), 3, rng):
+            counts[item] += 1
+    assert all(1300 < count < 1700 for count in counts)
@@ -0,0 +1,131 @@
+import contextlib
+import csv
+import time
+
+import pytest
+
+from string_helper import csv_writer
+from string_helper.csv_writer import CSVWriteError, CSVWriter
+from string_helper.nodes.string_list import BaseStringList
+
+FIELDNAMES = ['string', 'zh', 'tags']
+
+
+def load_strings(path):
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [row['string'] for row in csv.DictReader(f)]
+
+
+def rows(*strings):
+    return [{'string': string, 'zh': '', 'tags': ''} for string in strings]
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return CSVWriter(str(tmp_path / 'library.csv'), load_strings)
+
+
+@contextlib.contextmanager
+def hold_file_lock(csv_path):
+    """Hold the writer's file lock the way another process would, keeping requests queued"""
+    # A separate open file description conflicts with the writer's own flock
+    with open(csv_path + csv_writer.LOCK_SUFFIX, 'a+b') as holder:
+        csv_writer.fcntl.flock(holder.fileno(), csv_writer.fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            csv_writer.fcntl.flock(holder.fileno(), csv_writer.fcntl.LOCK_UN)
+
+
+needs_flock = pytest.mark.skipif(csv_writer.fcntl is None, reason='needs fcntl file locks')
+
+
+@needs_flock
+def test_submit_does_not_wait_for_file_lock_holder(writer):
+    with hold_file_lock(writer.csv_path):
+        writer.submit(rows('a girl'), FIELDNAMES)
+        time.sleep(0.05)
+        started = time.monotonic()
+        processed, skipped = writer.submit(rows('a girl', 'a dog'), FIELDNAMES)
+        assert time.monotonic() - started < 0.5
+
+    assert [row['string'] for row in processed] == ['a dog']
+    assert [row['string'] for row in skipped] == ['a girl']
+    writer.flush()
+    assert load_strings(writer.csv_path) == ['a girl', 'a dog']
+
+
+def test_failed_commit_is_raised_and_not_used_for_dedup(writer, monkeypatch):
+    commit = writer._commit
+
+    def fail_once(group):
+        monkeypatch.setattr(writer, '_commit', commit)
+        raise OSError('disk full')
+
+    monkeypatch.setattr(writer, '_commit', fail_once)
+    writer.submit(rows('a girl'), FIELDNAMES)
+    writer.wait()
+
+    # The next request is queued before the earlier failure is raised
+    with pytest.raises(CSVWriteError, match='disk full') as excinfo:
+        writer.submit(rows('a dog'), FIELDNAMES)
+    assert excinfo.value.failed_rows == rows('a girl')
+    processed, skipped = writer.submit(rows('a girl'), FIELDNAMES)
+    assert (len(processed), len(skipped)) == (1, 0)
+    writer.flush()
+    assert load_strings(writer.csv_path) == ['a dog', 'a girl']
+
+
+def test_synchronous_submit_raises_its_own_failure(writer, monkeypatch):
+    monkeypatch.setattr(csv_writer, 'ASYNC_WRITES', False)
+    monkeypatch.setattr(writer, '_commit', lambda group: 1 / 0)
+    with pytest.raises(CSVWriteError) as excinfo:
+        writer.submit(rows('a girl'), FIELDNAMES)
+    assert excinfo.value.failed_rows == rows('a girl')
+
+
+def test_save_to_csv_reports_failure_instead_of_skipping(tmp_path, monkeypatch):
+    path = str(tmp_path / 'library.csv')
+    node = BaseStringList()
+    writer = csv_writer.get_csv_writer(path, node.read_csv_strings)
+    commit = writer._commit
+
+    def fail_once(group):
+        monkeypatch.setattr(writer, '_commit', commit)
+        raise OSError('disk full')
+
+    monkeypatch.setattr(writer, '_commit', fail_once)
+    node.save_to_csv(path, rows('a girl'))
+    writer.wait()
+
+    with pytest.raises(CSVWriteError):
+        node.save_to_csv(path, rows('a dog'))
+    csv_writer.flush_writes(path)
+    assert load_strings(path) == ['a dog']
+
+
+def test_flush_raises_failed_commit_once(writer, monkeypatch):
+    monkeypatch.setattr(writer, '_commit', lambda group: 1 / 0)
+    writer.submit(rows('a girl'), FIELDNAMES)
+    with pytest.raises(CSVWriteError):
+        writer.flush()
+    writer.flush()
+
+
+@needs_flock
+def test_dedup_across_queued_truncating_request(writer):
+    writer.submit(rows('old', 'kept'), FIELDNAMES)
+    writer.flush()
+
+    with hold_file_lock(writer.csv_path):
+        time.sleep(0.05)
+        assert writer.submit(rows('kept'), FIELDNAMES)[1] == rows('kept')
+        writer.submit(rows('new'), FIELDNAMES, append=False)
+        # Rows of the file being overwritten no longer count, queued rows still do
+        processed, skipped = writer.submit(rows('old', 'new'), FIELDNAMES)
+
+    assert processed == rows('old')
+    assert skipped == rows('new')
+    writer.flush()
+    assert load_strings(writer.csv_path) == ['new', 'old']
+    assert 'kept' not in writer.dedup_index and 'old' in writer.dedup_index
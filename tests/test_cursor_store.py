@@ -0,0 +1,55 @@
+import collections
+import threading
+
+import pytest
+
+from string_helper.cursor_store import CursorStore, make_cursor_key
+
+THREADS = 8
+ADVANCES = 50
+
+
+def advance_concurrently(path, key, count=None):
+    """Advance one cursor from several threads, each with its own connection like separate processes"""
+    stores = [CursorStore(str(path)) for _ in range(THREADS)]
+    barrier = threading.Barrier(THREADS)
+    results = [[] for _ in range(THREADS)]
+
+    def run(store, positions):
+        barrier.wait()
+        for _ in range(ADVANCES):
+            positions.append(store.advance(key, count))
+
+    threads = [threading.Thread(target=run, args=args) for args in zip(stores, results)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [position for positions in results for position in positions]
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return tmp_path / 'cache' / 'cursors.sqlite3'
+
+
+def test_concurrent_advances_never_repeat_or_skip(store_path):
+    key = make_cursor_key('csv', 'library.csv', 'string')
+    positions = advance_concurrently(store_path, key)
+    assert sorted(positions) == list(range(THREADS * ADVANCES))
+    assert CursorStore(str(store_path)).advance(key) == THREADS * ADVANCES
+
+
+def test_concurrent_advances_wrap_evenly(store_path):
+    key = make_cursor_key('list', 'a', 'b', 'c')
+    count = 10
+    positions = advance_concurrently(store_path, key, count)
+    assert collections.Counter(positions) == {position: THREADS * ADVANCES // count for position in range(count)}
+
+
+def test_cursors_are_independent_and_persistent(store_path):
+    store = CursorStore(str(store_path))
+    assert [store.advance('a'), store.advance('a'), store.advance('b')] == [0, 1, 0]
+    assert CursorStore(str(store_path)).advance('a') == 2
+    store.reset('a')
+    assert store.advance('a') == 0 and store.advance('b') == 1
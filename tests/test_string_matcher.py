@@ -0,0 +1,53 @@
+import re
+
+import pytest
+
+from string_helper.nodes.string_matcher import ConditionTable
+
+
+def first_match(condition_list, match_str, default_value=''):
+    """The original rule scan: test every line in order, first match wins"""
+    for line in condition_list.split('\n'):
+        line = line.strip()
+        if ':' not in line:
+            continue
+        cond, val = line.split(':', 1)
+        cond = cond.strip()
+        try:
+            if re.match(f"^{cond}$", match_str):
+                return val.strip()
+        except re.error:
+            if cond == match_str:
+                return val.strip()
+    return default_value
+
+
+CONDITIONS = [
+    # Overlapping regexes: the earlier line wins even when a later one is more specific
+    'cat.*:animal\ncat(s)?:plural\n.*:any',
+    # A literal after a regex that also matches it, and before one
+    '[a-c]+:letters\nabc:literal\nx:early\nx+:many',
+    # Groups inside a merged pattern must not shift which rule is reported
+    '(a|b)(c):grouped\n((a)b)c:nested\nabc:literal\n(?:x)y:noncapture',
+    # Backreferences and inline flags keep the per-rule scan
+    r'(a)\1:double' + '\n(?i)A:flag\na+:many',
+    # Conditional group references count groups, which merging would renumber
+    'x:first\n(a)?(?(1)b|c):cond',
+    # Invalid regexes fall back to exact matches
+    '[oops:broken\noops.*:regex\n[:bracket',
+]
+INPUTS = ['ab', 'c', 'cat', 'cats', 'catalog', 'abc', 'cba', 'x', 'xx', 'ac', 'bc', 'xy', 'aa', 'A', 'a',
+          '[oops', 'oops!', '[', 'abc\n', 'x\n', '', 'dog']
+
+
+@pytest.mark.parametrize('condition_list', CONDITIONS)
+def test_merged_table_keeps_line_priority(condition_list):
+    table = ConditionTable(condition_list)
+    for match_str in INPUTS:
+        assert table.match(match_str, 'default') == first_match(condition_list, match_str, 'default'), match_str
+
+
+def test_regexes_are_merged_when_possible():
+    assert ConditionTable(CONDITIONS[2]).merged is not None
+    assert ConditionTable(CONDITIONS[3]).merged is None
+    assert ConditionTable(CONDITIONS[4]).merged is None
@@ -0,0 +1,73 @@
+import types
+
+import pytest
+
+from string_helper import template_engine
+from string_helper.template_engine import MAX_FORMAT_WIDTH, MAX_OUTPUT_LENGTH, TemplateError, parse_template
+
+
+def render(template, **args):
+    return parse_template(template).render(args)
+
+
+def test_renders_fields_filters_and_format_specs():
+    args = {'arg1': 'girl', 'arg2': ['soft', 'warm'], 'arg3': {'name': 'lora'}, 'arg4': 7}
+    assert render('{arg1|upper}, {arg2|join(" / ")}, {arg3.name}, {arg4:03d}', **args) == 'GIRL, soft / warm, lora, 007'
+
+
+@pytest.mark.parametrize('template', ['{arg1.__class__}', '{arg1._private}', '{arg1.upper.__self__}'])
+def test_rejects_underscore_attributes(template):
+    with pytest.raises(TemplateError):
+        parse_template(template)
+
+
+def test_rejects_frame_access():
+    def generator():
+        yield 1
+
+    with pytest.raises(TemplateError, match='frame'):
+        render('{arg1.gi_frame}', arg1=generator())
+
+
+def test_rejects_module_access():
+    with pytest.raises(TemplateError, match='module'):
+        render('{arg1.os}', arg1=types.SimpleNamespace(os=types))
+
+
+@pytest.mark.parametrize('template', ['{arg11}', '{os}', '{arg1.upper()}', '{arg1|eval}'])
+def test_rejects_unknown_names_calls_and_filters(template):
+    with pytest.raises(TemplateError):
+        parse_template(template)
+
+
+def test_rejects_format_width_over_limit():
+    parse_template('{arg1:%d}' % MAX_FORMAT_WIDTH)
+    with pytest.raises(TemplateError):
+        parse_template('{arg1:%d}' % (MAX_FORMAT_WIDTH + 1))
+    with pytest.raises(TemplateError):
+        parse_template('{arg1:.%df}' % (MAX_FORMAT_WIDTH + 1))
+
+
+def test_chained_replace_cannot_grow_output_without_limit():
+    template = '{arg1' + '|replace("", "xxxxxxxxxx")' * 8 + '}'
+    with pytest.raises(TemplateError, match='exceeds'):
+        render(template, arg1='abc')
+
+
+def test_join_is_capped(monkeypatch):
+    monkeypatch.setattr(template_engine, 'MAX_OUTPUT_LENGTH', 100)
+    assert render('{arg1|join("")}', arg1=['x'] * 100) == 'x' * 100
+    with pytest.raises(TemplateError):
+        render('{arg1|join("")}', arg1=['x'] * 101)
+
+
+def test_whole_render_is_capped(monkeypatch):
+    monkeypatch.setattr(template_engine, 'MAX_OUTPUT_LENGTH', 100)
+    assert len(render('{arg1}{arg1}', arg1='x' * 50)) == 100
+    with pytest.raises(TemplateError):
+        render('{arg1}{arg1}{arg1}', arg1='x' * 50)
+
+
+def test_default_limit_allows_normal_prompts():
+    assert MAX_OUTPUT_LENGTH >= 100000
+    assert render('{arg1|replace(",", ", ")}', arg1='a,b') == 'a, b'
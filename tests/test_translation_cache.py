@@ -0,0 +1,42 @@
+from string_helper import translation_cache as cache_module
+from string_helper.translation_cache import TranslationCache
+
+
+def test_get_many_returns_hits_in_order(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.sqlite3'))
+    cache.set_many([('a girl', '女孩'), ('a dog', '狗')], 'en', 'zh', 'local')
+    assert cache.get_many(['a dog', 'missing', 'a girl', 'a dog'], 'en', 'zh', 'local') == ['狗', None, '女孩', '狗']
+    assert cache.get('  a girl ', 'en', 'zh', 'local') == '女孩'
+    assert cache.get('a girl', 'en', 'ja', 'local') is None
+    assert (cache.hits, cache.misses) == (4, 2)
+
+
+def test_fresh_hits_do_not_write(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.sqlite3'))
+    cache.set('a girl', 'en', 'zh', 'local', '女孩')
+    conn = cache._connect()
+    changes = conn.total_changes
+    for _ in range(50):
+        assert cache.get('a girl', 'en', 'zh', 'local') == '女孩'
+    assert conn.total_changes == changes
+
+
+def test_stale_access_time_is_refreshed(tmp_path, monkeypatch):
+    cache = TranslationCache(str(tmp_path / 'cache.sqlite3'))
+    cache.set('a girl', 'en', 'zh', 'local', '女孩')
+    conn = cache._connect()
+    conn.execute('UPDATE translations SET last_access = last_access - ?', (cache_module.ACCESS_UPDATE_INTERVAL + 1,))
+    conn.commit()
+    before = conn.execute('SELECT last_access FROM translations').fetchone()[0]
+    cache.get('a girl', 'en', 'zh', 'local')
+    assert conn.execute('SELECT last_access FROM translations').fetchone()[0] > before
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = TranslationCache(str(tmp_path / 'cache.sqlite3'), ttl=10)
+    cache.set('a girl', 'en', 'zh', 'local', '女孩')
+    conn = cache._connect()
+    conn.execute('UPDATE translations SET created = created - 20')
+    conn.commit()
+    assert cache.get_many(['a girl'], 'en', 'zh', 'local') == [None]
+    assert conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0] == 0
@@ -0,0 +1,195 @@
+import json
+import threading
+import time
+
+import pytest
+
+from string_helper import translation_backends, translation_utils
+from string_helper.translation_backends import Translator, get_translator
+from string_helper.translation_cache import TranslationCache
+from string_helper.translation_utils import CircuitBreaker, TranslationError
+
+
+class FakeBackend(Translator):
+    """Runs one scripted behaviour per request: a delay in seconds, an exception, or None to succeed"""
+    name = 'fake'
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def translate(self, text, from_lang, to_lang, timeout=None):
+        with self._lock:
+            step = self.script.pop(0) if self.script else None
+            self.calls.append((text, timeout))
+            call = len(self.calls)
+        if isinstance(step, Exception):
+            raise step
+        if step:
+            time.sleep(step)
+        return f"{text}#{call}"
+
+
+@pytest.fixture
+def resilience(monkeypatch):
+    """Fast retries, no rate limit, no hedging and a fresh breaker for the fake backend"""
+    monkeypatch.setattr(translation_utils, 'REQUEST_TIMEOUT', 1.0)
+    monkeypatch.setattr(translation_utils, 'RETRY_ATTEMPTS', 3)
+    monkeypatch.setattr(translation_utils, 'RETRY_BACKOFF', 0.001)
+    monkeypatch.setattr(translation_utils, 'HEDGE_DELAY', 0)
+    monkeypatch.setitem(translation_utils._rate_limiters, FakeBackend.name, translation_utils.RateLimiter(0))
+    breaker = CircuitBreaker(threshold=3, cooldown=0.05)
+    monkeypatch.setitem(translation_utils._circuit_breakers, FakeBackend.name, breaker)
+    return breaker
+
+
+def test_request_timeout_is_passed_to_the_backend(resilience):
+    backend = FakeBackend()
+    assert translation_utils._translate_segment('a girl', 'en', 'zh', backend) == 'a girl#1'
+    assert backend.calls == [('a girl', 1.0)]
+
+
+def test_failures_are_retried_with_bounded_backoff(resilience, monkeypatch):
+    backoffs = []
+    monkeypatch.setattr(translation_utils.random, 'uniform', lambda low, high: backoffs.append(high) or 0)
+    backend = FakeBackend(OSError('reset'), OSError('reset'))
+
+    assert translation_utils._translate_segment('a girl', 'en', 'zh', backend) == 'a girl#3'
+    assert backoffs == [0.001, 0.002]
+    assert resilience.state == 'closed' and resilience.failures == 0
+
+
+def test_exhausted_retries_raise_backend_error(resilience):
+    backend = FakeBackend(*[OSError('reset')] * 3)
+
+    with pytest.raises(TranslationError) as excinfo:
+        translation_utils._translate_segment('a girl', 'en', 'zh', backend)
+    assert (excinfo.value.kind, excinfo.value.attempts) == ('backend', 3)
+    assert len(backend.calls) == 3
+
+
+def test_breaker_opens_then_half_opens_and_closes(resilience):
+    backend = FakeBackend(*[OSError('down')] * 3)
+    with pytest.raises(TranslationError):
+        translation_utils._translate_segment('a girl', 'en', 'zh', backend)
+    assert resilience.state == 'open'
+
+    # While open, requests fail without reaching the backend
+    with pytest.raises(TranslationError) as excinfo:
+        translation_utils._translate_segment('a dog', 'en', 'zh', backend)
+    assert excinfo.value.kind == 'circuit_open'
+    assert len(backend.calls) == 3
+
+    # After the cooldown one probe is let through; a failed probe reopens the breaker
+    time.sleep(0.06)
+    assert resilience.state == 'half-open'
+    assert resilience.allow() and not resilience.allow()
+    resilience.record_failure()
+    assert resilience.state == 'open'
+
+    # A successful probe closes it again
+    time.sleep(0.06)
+    assert translation_utils._translate_segment('a cat', 'en', 'zh', backend) == 'a cat#4'
+    assert resilience.state == 'closed'
+
+
+def test_slow_request_times_out(resilience, monkeypatch):
+    monkeypatch.setattr(translation_utils, 'REQUEST_TIMEOUT', 0.05)
+    monkeypatch.setattr(translation_utils, 'RETRY_ATTEMPTS', 1)
+    backend = FakeBackend(0.3)
+
+    started = time.monotonic()
+    with pytest.raises(TranslationError) as excinfo:
+        translation_utils._translate_segment('a girl', 'en', 'zh', backend)
+    assert excinfo.value.kind == 'timeout'
+    assert time.monotonic() - started < 0.25
+
+
+def test_hedged_request_returns_the_faster_response(resilience, monkeypatch):
+    monkeypatch.setattr(translation_utils, 'HEDGE_DELAY', 0.02)
+    backend = FakeBackend(0.5, None)
+
+    started = time.monotonic()
+    assert translation_utils._translate_segment('a girl', 'en', 'zh', backend) == 'a girl#2'
+    assert time.monotonic() - started < 0.4
+    assert len(backend.calls) == 2
+
+
+def test_fast_response_is_not_hedged(resilience, monkeypatch):
+    monkeypatch.setattr(translation_utils, 'HEDGE_DELAY', 0.2)
+    backend = FakeBackend()
+
+    assert translation_utils._translate_segment('a girl', 'en', 'zh', backend) == 'a girl#1'
+    assert len(backend.calls) == 1
+
+
+def test_local_dictionary_is_loaded_from_file_and_not_cached(tmp_path, monkeypatch):
+    cache = TranslationCache(':memory:')
+    monkeypatch.setattr(translation_utils, 'translation_cache', cache)
+    dictionary = tmp_path / 'dictionary.json'
+    dictionary.write_text(json.dumps({'zh': {'a girl': '女孩'}}), encoding='utf-8')
+    local = get_translator('local')
+    monkeypatch.setattr(local, 'path', str(dictionary))
+    monkeypatch.setattr(local, 'dictionary', {})
+    monkeypatch.setattr(local, '_signature', None)
+
+    assert translation_utils.translate_texts(['a girl', 'a dog'], 'zh', 'local') == ['女孩', 'a dog']
+    assert cache.get_many(['a girl', 'a dog'], 'auto', 'zh', 'local') == [None, None]
+
+    dictionary.write_text(json.dumps({'zh': {'a girl': '女孩', 'a dog': '狗'}}), encoding='utf-8')
+    assert translation_utils.translate_texts(['a dog'], 'zh', 'local') == ['狗']
+
+
+class RecordingBackend(Translator):
+    """Wraps every line in brackets and records the lines that were sent"""
+    name = 'recording'
+    cache_results = False
+
+    def __init__(self):
+        self.lines = []
+
+    def translate(self, text, from_lang, to_lang, timeout=None):
+        lines = text.split('\n')
+        self.lines += lines
+        return '\n'.join(f"[{line}]" for line in lines)
+
+
+@pytest.fixture
+def recording(monkeypatch):
+    backend = RecordingBackend()
+    monkeypatch.setitem(translation_backends._translators, backend.name, backend)
+    monkeypatch.setitem(translation_utils._rate_limiters, backend.name, translation_utils.RateLimiter(0))
+    monkeypatch.setattr(translation_utils, 'SKIP_SAME_LANGUAGE', True)
+    return backend
+
+
+def test_target_language_text_is_not_sent(recording):
+    texts = ['一个女孩在海边', '東京']
+    assert translation_utils.translate_texts(texts, 'zh', recording.name) == texts
+    assert translation_utils.translate_texts(['a girl on the beach'], 'en', recording.name) == ['a girl on the beach']
+    assert recording.lines == []
+
+
+def test_mixed_text_sends_only_foreign_segments(recording):
+    text = '一个女孩, a red dress'
+    assert translation_utils.translate_texts([text], 'zh', recording.name) == ['一个女孩, [a red dress]']
+    assert translation_utils.translate_texts([text], 'en', recording.name) == ['[一个女孩], a red dress']
+    assert recording.lines == ['a red dress', '一个女孩']
+
+
+def test_short_or_ambiguous_text_is_still_translated(recording):
+    texts = ['ok', 'Tokyo', '1girl', 'perro grande']
+    assert translation_utils.translate_texts(texts, 'en', recording.name) == [f"[{text}]" for text in texts]
+    assert sorted(recording.lines) == sorted(texts)
+
+
+def test_foreign_text_is_sent_whole(recording):
+    text = 'la fille est sur la plage'
+    assert translation_utils.translate_texts([text], 'en', recording.name) == [f"[{text}]"]
+    assert recording.lines == [text]
+
+
+def test_skipping_can_be_disabled(recording, monkeypatch):
+    monkeypatch.setattr(translation_utils, 'SKIP_SAME_LANGUAGE', False)
+    assert translation_utils.translate_texts(['一个女孩在海边'], 'zh', recording.name) == ['[一个女孩在海边]']
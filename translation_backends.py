@@ -0,0 +1,105 @@
+import importlib
+import json
+import os
+import threading
+import time
+
+# 离线引擎使用的词典文件（JSON，格式为 {目标语言: {原文: 译文}}），未设置时离线引擎不翻译任何内容
+LOCAL_DICTIONARY_PATH = os.environ.get('STRING_HELPER_LOCAL_DICTIONARY', '')
+
+
+class Translator:
+    """
+    翻译引擎接口。子类需设置唯一的name并实现translate方法。
+    cache_results为False时翻译结果不写入持久翻译缓存。
+    """
+    name = None
+    cache_results = True
+
+    def translate(self, text, from_lang, to_lang, timeout=None):
+        """翻译单个请求文本，失败时抛出异常；timeout为网络请求的超时时间（秒），None表示不限制"""
+        raise NotImplementedError
+
+
+class TranslatorsBackend(Translator):
+    """
+    基于 translators 包的在线翻译引擎（如必应）。translators 包在首次翻译时才会导入。
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module('translators')
+        return self._module
+
+    def translate(self, text, from_lang, to_lang, timeout=None):
+        # 超时交给底层HTTP请求，卡住的连接会被关闭并释放请求线程
+        return self._load().translate_text(text, translator=self.name, from_language=from_lang, to_language=to_lang,
+                                           timeout=timeout)
+
+
+class LocalTranslator(Translator):
+    """
+    离线翻译引擎：逐行查询本地词典，未收录的行原样返回。
+    词典可直接传入，或从path指定的JSON文件加载（文件修改后自动重新加载）。
+    结果确定且无需网络，可用于离线运行和基准测试；latency可模拟每次请求的网络延迟（秒）。
+    原样返回的行并不是译文，且查词典比查缓存更快，因此结果不写入持久翻译缓存。
+    """
+    name = 'local'
+    cache_results = False
+
+    def __init__(self, dictionary=None, latency=0.0, path=None):
+        # 词典格式：{目标语言: {原文: 译文}}
+        self.dictionary = dictionary or {}
+        self.latency = latency
+        self.path = path
+        self._signature = None
+        self._lock = threading.Lock()
+
+    def _entries(self, to_lang):
+        if self.path:
+            with self._lock:
+                st = os.stat(self.path)
+                signature = (st.st_mtime_ns, st.st_size)
+                if signature != self._signature:
+                    with open(self.path, 'r', encoding='utf-8') as f:
+                        self.dictionary = json.load(f)
+                    self._signature = signature
+        return self.dictionary.get(to_lang, {})
+
+    def translate(self, text, from_lang, to_lang, timeout=None):
+        if self.latency:
+            time.sleep(self.latency)
+        entries = self._entries(to_lang)
+        return '\n'.join(entries.get(line.strip(), line) for line in text.split('\n'))
+
+
+_translators = {}
+
+
+def register_translator(translator):
+    """注册翻译引擎，同名引擎会被替换"""
+    _translators[translator.name] = translator
+
+
+def get_translator(name):
+    """按名称获取翻译引擎"""
+    try:
+        return _translators[name]
+    except KeyError:
+        raise ValueError(f"Unknown translator: {name}. Available: {available_translators()}")
+
+
+def available_translators():
+    """返回已注册的翻译引擎名称列表"""
+    return list(_translators)
+
+
+register_translator(TranslatorsBackend('bing'))
+register_translator(LocalTranslator(path=LOCAL_DICTIONARY_PATH or None))
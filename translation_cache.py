@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+
+# 缓存文件默认位置（插件目录下的 cache 目录），可通过环境变量覆盖
+CACHE_PATH = os.environ.get(
+    'STRING_HELPER_TRANSLATION_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'translations.sqlite3')
+)
+# 最大缓存条目数，超出后按最近最少使用（LRU）淘汰
+CACHE_MAX_ENTRIES = 100000
+# 缓存有效期（秒），默认30天
+CACHE_TTL = 30 * 24 * 3600
+# 每写入多少次检查一次淘汰，避免每次写入都统计全表
+EVICT_INTERVAL = 100
+# 命中时只在上次访问时间早于该间隔（秒）时才更新，避免每次命中都产生一次写事务
+ACCESS_UPDATE_INTERVAL = 3600
+# 单条SQL语句中最多绑定的键数（SQLite默认变量上限为999）
+QUERY_BATCH_SIZE = 500
+
+
+def normalize_text(text):
+    """
+    规范化待翻译文本：统一Unicode组合形式并去除首尾空白，使等价文本命中同一缓存。
+    """
+    return unicodedata.normalize('NFC', text).strip()
+
+
+class TranslationCache:
+    """
+    基于SQLite的持久化翻译缓存。
+    以（规范化文本、源语言、目标语言、翻译引擎）的哈希作为键，支持LRU/TTL淘汰、容量上限和命中统计。
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if self.path != ':memory:' and directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                'created REAL NOT NULL, last_access REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON translations (last_access)')
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(text, from_lang, to_lang, translator):
+        """根据规范化文本、语言对和翻译引擎生成内容寻址键"""
+        payload = '\x1f'.join((translator, from_lang, to_lang, normalize_text(text)))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, text, from_lang, to_lang, translator):
+        """查询缓存，未命中或已过期时返回None"""
+        return self.get_many([text], from_lang, to_lang, translator)[0]
+
+    def get_many(self, texts, from_lang, to_lang, translator):
+        """
+        在一个事务内批量查询缓存，返回与texts顺序一致的结果，未命中或已过期的项为None。
+        命中项的最近访问时间只在超过ACCESS_UPDATE_INTERVAL后才更新。
+        """
+        keys = [self.make_key(text, from_lang, to_lang, translator) for text in texts]
+        now = time.time()
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                expired = []
+                stale = []
+                unique_keys = list(dict.fromkeys(keys))
+                for start in range(0, len(unique_keys), QUERY_BATCH_SIZE):
+                    chunk = unique_keys[start:start + QUERY_BATCH_SIZE]
+                    rows = conn.execute(
+                        f'SELECT key, value, created, last_access FROM translations '
+                        f'WHERE key IN ({",".join("?" * len(chunk))})', chunk
+                    )
+                    for key, value, created, last_access in rows:
+                        if self.ttl and now - created > self.ttl:
+                            expired.append((key,))
+                            continue
+                        found[key] = value
+                        if now - last_access > ACCESS_UPDATE_INTERVAL:
+                            stale.append((now, key))
+                if expired or stale:
+                    conn.executemany('DELETE FROM translations WHERE key = ?', expired)
+                    conn.executemany('UPDATE translations SET last_access = ? WHERE key = ?', stale)
+                    conn.commit()
+        except sqlite3.Error as e:
+            print(f"Translation cache error: {str(e)}")
+
+        results = [found.get(key) for key in keys]
+        hits = sum(result is not None for result in results)
+        self.hits += hits
+        self.misses += len(results) - hits
+        return results
+
+    def set(self, text, from_lang, to_lang, translator, value):
+        """写入缓存，并在超出容量时淘汰最久未使用的条目"""
+        self.set_many([(text, value)], from_lang, to_lang, translator)
+
+    def set_many(self, items, from_lang, to_lang, translator):
+        """在一个事务内写入多条 (原文, 译文)，并在超出容量时淘汰最久未使用的条目"""
+        now = time.time()
+        rows = [(self.make_key(text, from_lang, to_lang, translator), value, now, now) for text, value in items]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.executemany(
+                    'INSERT OR REPLACE INTO translations (key, value, created, last_access) VALUES (?, ?, ?, ?)', rows
+                )
+                writes = self._writes + len(rows)
+                if writes // EVICT_INTERVAL != self._writes // EVICT_INTERVAL:
+                    self._evict(conn, now)
+                self._writes = writes
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"Translation cache error: {str(e)}")
+
+    def _evict(self, conn, now):
+        if self.ttl:
+            conn.execute('DELETE FROM translations WHERE created < ?', (now - self.ttl,))
+        count = conn.execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+        if count > self.max_entries:
+            conn.execute(
+                'DELETE FROM translations WHERE key IN '
+                '(SELECT key FROM translations ORDER BY last_access ASC LIMIT ?)',
+                (count - self.max_entries,)
+            )
+
+    def clear(self):
+        """清空缓存及统计"""
+        with self._lock:
+            conn = self._connect()
+            conn.execute('DELETE FROM translations')
+            conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """返回命中/未命中次数及当前条目数"""
+        with self._lock:
+            try:
+                entries = self._connect().execute('SELECT COUNT(*) FROM translations').fetchone()[0]
+            except sqlite3.Error:
+                entries = 0
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries}
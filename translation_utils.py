@@ -1,8 +1,47 @@
-import translators as ts
+import os
+import random
 import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from .translation_backends import get_translator, available_translators
+from .translation_cache import TranslationCache
+from .language_detect import LATIN_STOPWORDS, detect_language, normalize_language, single_script, split_by_language
+from .stats import stats
 
 # 输入长度限制
 INPUT_LIMIT = 1000
+# 默认翻译引擎，可通过环境变量切换（如 local 离线引擎）
+DEFAULT_TRANSLATOR = os.environ.get('STRING_HELPER_TRANSLATOR', 'bing')
+# 批量翻译时片段之间的分隔符
+BATCH_DELIMITER = '\n'
+# 每个批次最多包含的片段数
+BATCH_MAX_SEGMENTS = 50
+# 最大并发翻译请求数
+MAX_WORKERS = int(os.environ.get('STRING_HELPER_TRANSLATION_WORKERS', 4))
+# 每个翻译服务每秒最多发送的请求数（0表示不限制）
+RATE_LIMIT = float(os.environ.get('STRING_HELPER_TRANSLATION_RATE', 5))
+
+# 单次翻译请求的超时时间（秒，0表示不限制）
+REQUEST_TIMEOUT = float(os.environ.get('STRING_HELPER_TRANSLATION_TIMEOUT', 30))
+# 每个请求最多尝试的次数（含首次）
+RETRY_ATTEMPTS = max(1, int(os.environ.get('STRING_HELPER_TRANSLATION_RETRIES', 3)))
+# 重试退避的初始等待与最长等待（秒），实际等待在 [0, 上限] 内随机
+RETRY_BACKOFF = 0.5
+RETRY_BACKOFF_MAX = 8.0
+# 请求超过该时间（秒）未返回时再发送一个相同的对冲请求，取先返回的结果（0表示不对冲）
+HEDGE_DELAY = float(os.environ.get('STRING_HELPER_TRANSLATION_HEDGE_DELAY', 0))
+# 连续失败多少次后熔断，熔断后多少秒内直接失败
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+# 跳过已是目标语言的文本和片段（设为 0/false/no/off 关闭）
+SKIP_SAME_LANGUAGE = os.environ.get('STRING_HELPER_SKIP_SAME_LANGUAGE', '1').lower() not in ('0', 'false', 'no', 'off')
+# 翻译失败时返回文本的前缀
+TRANSLATION_FAILED_PREFIX = "[翻译失败]"
+
+# 全局翻译缓存
+translation_cache = TranslationCache()
 
 def split_text_for_translation(text):
     """
@@ -60,51 +99,417 @@ def split_text_for_translation(text):
     
     return split_paragraphs
 
-def translate_text(text, from_lang='en', to_lang='zh'):
+def _plan_text(text):
     """
-    自动处理长文本，按段落和句子拆分，逐句翻译，组合返回。
-    对于短文本，直接翻译。
+    生成翻译计划：返回段落列表，每个段落为待翻译的片段列表（空段落为空列表）。
     """
-    if not text:
-        return ""
+    # 如果整个文本长度小于INPUT_LIMIT，直接作为一个片段翻译
+    if len(text) < INPUT_LIMIT:
+        return [[text]]
+    
+    return [[sent.strip() for sent in sentences if sent.strip()]
+            for sentences in split_text_for_translation(text)]
+
+class RateLimiter:
+    """
+    令牌桶限流器，限制对同一翻译服务的请求速率（线程安全）。
+    """
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """获取一个令牌，令牌不足时阻塞等待"""
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+_rate_limiters = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(host):
+    """获取指定翻译服务的限流器"""
+    with _rate_limiters_lock:
+        if host not in _rate_limiters:
+            _rate_limiters[host] = RateLimiter(RATE_LIMIT)
+        return _rate_limiters[host]
+
+def run_concurrently(func, items, max_workers=MAX_WORKERS):
+    """
+    使用有界线程池并发执行func，按输入顺序返回结果；单个任务抛出的异常作为结果返回。
+    """
+    def call(item):
+        try:
+            return func(item)
+        except Exception as e:
+            return e
+
+    if max_workers <= 1 or len(items) <= 1:
+        return [call(item) for item in items]
     
-    try:
-        # 如果整个文本长度小于INPUT_LIMIT，直接翻译
-        if len(text) < INPUT_LIMIT:
-            return ts.translate_text(text, translator='bing', from_language=from_lang, to_language=to_lang)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items))
+
+class TranslationError(Exception):
+    """
+    翻译失败。kind为 timeout（超时）、circuit_open（翻译服务熔断中）或 backend（翻译服务报错），
+    attempts为已尝试的次数。
+    """
+    def __init__(self, translator, kind, message, attempts=0):
+        super().__init__(message)
+        self.translator = translator
+        self.kind = kind
+        self.attempts = attempts
+
+    def __str__(self):
+        return f"{self.translator} {self.kind}: {self.args[0]}"
+
+class CircuitBreaker:
+    """
+    熔断器：连续失败达到阈值后打开，冷却期内的请求直接失败；冷却结束后放行一个试探请求，成功则恢复（线程安全）。
+    """
+    def __init__(self, threshold=BREAKER_THRESHOLD, cooldown=BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        return 'half-open' if time.monotonic() - self.opened_at >= self.cooldown else 'open'
+
+    def allow(self):
+        """是否允许发送请求"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.threshold:
+                if self.opened_at is None or self._trial:
+                    stats.incr('translation.circuit_opened')
+                self.opened_at = time.monotonic()
+                self._trial = False
+
+_circuit_breakers = {}
+
+def get_circuit_breaker(host):
+    """获取指定翻译服务的熔断器"""
+    with _rate_limiters_lock:
+        if host not in _circuit_breakers:
+            _circuit_breakers[host] = CircuitBreaker()
+        return _circuit_breakers[host]
+
+# 发送单个请求的线程池：调用方按超时放弃等待，卡住的请求不会阻塞节点执行；
+# 超时同时传给翻译引擎，由网络请求自身结束，避免卡住的请求长期占用线程池
+_request_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS * 4, thread_name_prefix='string_helper_translate')
+
+def _send_request(text, from_lang, to_lang, backend):
+    """向翻译服务发送一次请求（受限流控制）"""
+    get_rate_limiter(backend.name).acquire()
+    if stats.enabled:
+        stats.incr('translation.requests')
+        stats.incr('translation.request_bytes', len(text.encode('utf-8')))
+    with stats.timer('translation.request'):
+        return backend.translate(text, from_lang, to_lang, timeout=REQUEST_TIMEOUT if REQUEST_TIMEOUT > 0 else None)
+
+def _request_with_deadline(text, from_lang, to_lang, backend):
+    """
+    发送一次请求，超过REQUEST_TIMEOUT未返回时抛出超时错误；
+    开启对冲时，请求超过HEDGE_DELAY未返回则再发送一个相同请求，取先成功的结果。
+    """
+    if REQUEST_TIMEOUT <= 0 and HEDGE_DELAY <= 0:
+        return _send_request(text, from_lang, to_lang, backend)
+
+    deadline = time.monotonic() + REQUEST_TIMEOUT if REQUEST_TIMEOUT > 0 else None
+    pending = {_request_executor.submit(_send_request, text, from_lang, to_lang, backend)}
+    if HEDGE_DELAY > 0:
+        delay = HEDGE_DELAY if deadline is None else min(HEDGE_DELAY, REQUEST_TIMEOUT)
+        done, _ = wait(pending, timeout=delay)
+        if not done:
+            stats.incr('translation.hedged_requests')
+            pending.add(_request_executor.submit(_send_request, text, from_lang, to_lang, backend))
+
+    error = None
+    while pending:
+        timeout = None if deadline is None else deadline - time.monotonic()
+        if timeout is not None and timeout <= 0:
+            break
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+    if error is not None and not pending:
+        raise error
+    raise TranslationError(backend.name, 'timeout', f"No response within {REQUEST_TIMEOUT:g}s")
+
+def _translate_segment(text, from_lang, to_lang, backend):
+    """
+    向翻译服务发送单个翻译请求：受限流和熔断控制，失败或超时后按带随机抖动的指数退避重试，
+    最终失败时抛出TranslationError。
+    """
+    breaker = get_circuit_breaker(backend.name)
+    for attempt in range(1, RETRY_ATTEMPTS + 1):
+        if not breaker.allow():
+            raise TranslationError(backend.name, 'circuit_open',
+                                   f"Translator is failing, retry after {breaker.cooldown:g}s", attempt - 1)
+        try:
+            result = _request_with_deadline(text, from_lang, to_lang, backend)
+        except Exception as e:
+            breaker.record_failure()
+            if attempt == RETRY_ATTEMPTS:
+                if isinstance(e, TranslationError):
+                    e.attempts = attempt
+                    raise
+                raise TranslationError(backend.name, 'backend', str(e), attempt) from e
+            stats.incr('translation.retries')
+            time.sleep(random.uniform(0, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF * 2 ** (attempt - 1))))
+            continue
+        breaker.record_success()
+        return result
+
+def pack_segments(segments, limit=INPUT_LIMIT, max_segments=BATCH_MAX_SEGMENTS):
+    """
+    将多个片段打包为尽量少的批次，每批合并后的长度（含分隔符）小于limit。
+    包含分隔符或空白的片段无法安全拼接，单独成批。
+    """
+    batches = []
+    current_group = []
+    current_length = 0
+    
+    for sent in segments:
+        if BATCH_DELIMITER in sent or not sent.strip() or len(sent) >= limit:
+            batches.append([sent])
+            continue
+        
+        sent_length = len(sent) + (len(BATCH_DELIMITER) if current_group else 0)
+        if current_group and (current_length + sent_length >= limit or len(current_group) >= max_segments):
+            batches.append(current_group)
+            current_group = []
+            current_length = 0
+            sent_length = len(sent)
         
-        # 拆分文本为段落和句子
-        split_paragraphs = split_text_for_translation(text)
+        current_group.append(sent)
+        current_length += sent_length
+    
+    if current_group:
+        batches.append(current_group)
+    
+    return batches
 
-        translated_paragraphs = []
+def _pack_by_language(segments, from_lang):
+    """
+    自动检测源语言时，翻译服务只会为整个请求检测一种语言，因此先按检测出的语言分组，
+    同一批次只包含同一语言的片段；指定了源语言时直接打包。
+    """
+    if from_lang != 'auto':
+        return pack_segments(segments)
+    groups = {}
+    for sent in segments:
+        groups.setdefault(detect_language(sent), []).append(sent)
+    return [batch for group in groups.values() for batch in pack_segments(group)]
+
+def _translate_batch(batch, from_lang, to_lang, backend):
+    """
+    将一个批次合并为单个请求翻译，再按分隔符拆分回各片段。
+    若返回的行数与片段数不一致（无法对齐），则将批次一分为二分别重试。
+    """
+    if len(batch) == 1:
+        return [_translate_segment(batch[0], from_lang, to_lang, backend)]
+    
+    translated = _translate_segment(BATCH_DELIMITER.join(batch), from_lang, to_lang, backend)
+    parts = translated.split(BATCH_DELIMITER)
+    if len(parts) == len(batch):
+        return [part.strip() for part in parts]
+    
+    mid = len(batch) // 2
+    return (_translate_batch(batch[:mid], from_lang, to_lang, backend) +
+            _translate_batch(batch[mid:], from_lang, to_lang, backend))
+
+def _translate_many(texts, from_lang, to_lang, translator=None, max_workers=MAX_WORKERS):
+    """
+    批量翻译：先查询缓存，再将所有未命中文本的片段去重、打包后并发翻译，最后按原顺序重组段落。
+    """
+    backend = get_translator(translator or DEFAULT_TRANSLATOR)
+    results = [''] * len(texts)
+    plans = {}
+    segments = {}
+    
+    # 优先从缓存读取（一次批量查询）
+    indices = [i for i, text in enumerate(texts) if text]
+    if backend.cache_results:
+        cached_values = translation_cache.get_many([texts[i] for i in indices], from_lang, to_lang, backend.name)
+    else:
+        cached_values = [None] * len(indices)
+    for i, cached in zip(indices, cached_values):
+        text = texts[i]
+        if cached is not None:
+            stats.incr('translation.cache_hits')
+            results[i] = cached
+            continue
+        if backend.cache_results:
+            stats.incr('translation.cache_misses')
         
-        for sentences in split_paragraphs:
-            if sentences == ['']:
-                translated_paragraphs.append('')
-                continue
-            
-            translated_sentences = []
+        plans[i] = _plan_text(text)
+        for sentences in plans[i]:
             for sent in sentences:
-                sent = sent.strip()
-                if not sent:
-                    continue
-                # 逐句翻译
-                translated = ts.translate_text(sent, translator='bing', from_language=from_lang, to_language=to_lang)
-                translated_sentences.append(translated)
-            translated_paragraphs.append(''.join(translated_sentences))
+                segments.setdefault(sent, None)
+    
+    # 将片段打包为批次后并发翻译
+    batches = _pack_by_language(list(segments), from_lang)
+    with stats.timer('translation.batch_wall'):
+        translated = run_concurrently(
+            lambda batch: _translate_batch(batch, from_lang, to_lang, backend), batches, max_workers
+        )
+    for batch, result in zip(batches, translated):
+        if isinstance(result, Exception):
+            result = [result] * len(batch)
+        segments.update(zip(batch, result))
+    
+    # 按原有段落结构重组
+    translated_items = []
+    for i, plan in plans.items():
+        errors = [segments[sent] for sentences in plan for sent in sentences
+                  if isinstance(segments[sent], Exception)]
+        if errors:
+            stats.incr('translation.failed_texts')
+            error = errors[0]
+            if not isinstance(error, TranslationError):
+                error = TranslationError(backend.name, 'backend', str(error))
+            results[i] = error
+            continue
         
-        return '\n'.join(translated_paragraphs)
-    except Exception as e:
-        return f"[翻译失败] {str(e)}"
+        translated_text = '\n'.join(''.join(segments[sent] for sent in sentences) for sentences in plan)
+        translated_items.append((texts[i], translated_text))
+        results[i] = translated_text
+    
+    if backend.cache_results:
+        translation_cache.set_many(translated_items, from_lang, to_lang, backend.name)
+    return results
 
+def _whole_text_languages(text, target):
+    """
+    文本只用一种文字系统、且无需逐段检测即可判断时返回整段的语言集合，否则返回None（需要切分检测）。
+    拉丁字母文本在目标语言也用拉丁字母时可能混有多种语言，仍需切分。
+    """
+    script = single_script(text)
+    if script is None or (script == 'latin' and target in LATIN_STOPWORDS):
+        return None
+    return {'latin' if script == 'latin' else detect_language(text)}
+
+def _translate_foreign(texts, from_lang, to_lang, translator=None, max_workers=MAX_WORKERS):
+    """
+    只翻译不是目标语言的内容：已是目标语言的文本原样返回，混合语言的文本只发送其中的外语片段，
+    其余片段和分隔符保持不变；整段都是外语时仍作为一个整体翻译，以保留上下文。
+    """
+    if not SKIP_SAME_LANGUAGE:
+        return _translate_many(texts, from_lang, to_lang, translator, max_workers)
+
+    target = normalize_language(to_lang)
+    layouts = []
+    pending = {}
+    for text in texts:
+        languages = _whole_text_languages(text, target) if text else set()
+        if languages is None:
+            pieces = split_by_language(text)
+            languages = {language for _, language in pieces if language is not None}
+        if not languages - {target}:
+            stats.incr('translation.skipped_same_language')
+            layouts.append([text])
+            continue
+        if target not in languages:
+            layouts.append([('', text, '')])
+            pending.setdefault(text, None)
+            continue
+
+        stats.incr('translation.mixed_language')
+        layout = []
+        for piece, language in pieces:
+            if language in (None, target):
+                layout.append(piece)
+                continue
+            core = piece.strip()
+            start = piece.index(core)
+            layout.append((piece[:start], core, piece[start + len(core):]))
+            pending.setdefault(core, None)
+        layouts.append(layout)
+
+    sources = list(pending)
+    pending.update(zip(sources, _translate_many(sources, from_lang, to_lang, translator, max_workers)))
+
+    results = []
+    for layout in layouts:
+        parts = []
+        for part in layout:
+            if isinstance(part, str):
+                parts.append(part)
+                continue
+            lead, core, trail = part
+            translated = pending[core]
+            if isinstance(translated, TranslationError):
+                parts = translated
+                break
+            parts.append(lead + translated + trail)
+        results.append(parts if isinstance(parts, TranslationError) else ''.join(parts))
+    return results
+
+def translate_text(text, from_lang='en', to_lang='zh', translator=None, max_workers=MAX_WORKERS):
+    """
+    自动处理长文本，按段落和句子拆分，并发翻译各片段，按原顺序组合返回。
+    对于短文本，直接翻译。
+    """
+    if not text:
+        return ""
+    
+    return _failure_text(_translate_foreign([text], from_lang, to_lang, translator, max_workers)[0])
+
+
+def translate_texts(strings, target_language, translator=None, max_workers=MAX_WORKERS):
+    """
+    自动检测源语言，并发翻译字符串列表，返回结果与输入顺序一致；已是目标语言的字符串不会发送给翻译服务。
+    translator为翻译引擎名称，默认使用DEFAULT_TRANSLATOR。翻译失败的项为以TRANSLATION_FAILED_PREFIX开头的说明文字。
+    """
+    return [_failure_text(result) for result in
+            translate_texts_detailed(strings, target_language, translator, max_workers)]
+
+
+def translate_texts_detailed(strings, target_language, translator=None, max_workers=MAX_WORKERS):
+    """
+    与translate_texts相同，但翻译失败的项为TranslationError对象，调用方可据此决定保留原文、留空或重试。
+    """
+    return _translate_foreign(list(strings), 'auto', target_language, translator, max_workers)
 
-def translate_texts(strings, target_language):
-    translated_strings = []
-    for text in strings:
-        try:
-            translated_string = translate_text(text, 'auto', target_language)
-            translated_strings.append(translated_string)
-        except Exception as e:
-            translated_strings.append(f"Translation error: {str(e)}")  
 
-    return translated_strings
+def _failure_text(result):
+    if isinstance(result, TranslationError):
+        return f"{TRANSLATION_FAILED_PREFIX} {result}"
+    return result